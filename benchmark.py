@@ -0,0 +1,378 @@
+"""
+Offline benchmark suite for the analysis side of the tracker.
+Times the analyzers, filters, session updates and overlay rendering on landmark
+fixtures and synthetic frames - no camera, pose model or Tk window needed - and
+compares ops/sec and per-op allocations with a stored baseline.
+
+    python benchmark.py                    # run and compare with benchmarks/baseline.json
+    python benchmark.py --update-baseline  # store this machine's results as the baseline
+    python benchmark.py --make-fixtures    # regenerate the synthetic fixtures
+    python benchmark.py --record VIDEO     # add a fixture recorded from a video (runs MediaPipe)
+
+Exits with status 1 when a benchmark regresses past the tolerance.
+"""
+
+# Imports
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import mediapipe as mp
+
+from core.batch import OFFLINE_PROCESS_VAR
+from core.landmarks import LandmarkFrame
+from core.latency import LatencyStats
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.pose_estimator import array_to_results
+from core.session import PoseSession
+from core.synthetic import synthetic_sequence
+from filters.kalman2D import Kalman2D, KalmanBank, rts_smooth
+from filters.oneEuro import OneEuro, OneEuroBank, LANDMARK_MIN_CUTOFF, LANDMARK_BETA
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Rendering writes whole frames and swings by +-20% between runs with memory
+# and cache noise, so these run longer and get twice the tolerance
+NOISY = ('render.',)
+NOISY_TIME_FACTOR = 5
+NOISY_REPEAT = 7
+
+SYNTHETIC_FIXTURES = {
+    'synthetic_front_split': dict(pose='front_split', n_frames=300, seed=1),
+    'synthetic_forward_fold': dict(pose='forward_fold', n_frames=300, seed=2),
+}
+
+
+# === Fixtures ===
+
+def save_fixture(name, landmarks, meta):
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    np.save(os.path.join(FIXTURE_DIR, name + ".npy"), np.asarray(landmarks, dtype=np.float32))
+    with open(os.path.join(FIXTURE_DIR, name + ".json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def make_fixtures():
+    for name, kwargs in SYNTHETIC_FIXTURES.items():
+        landmarks, _ = synthetic_sequence(**kwargs)
+        save_fixture(name, landmarks, {
+            'pose': kwargs['pose'], 'width': 640, 'height': 480, 'fps': 30,
+            'source': f"core.synthetic.synthetic_sequence(**{kwargs})",
+        })
+        print(f"wrote {name}: {len(landmarks)} frames")
+
+
+def record_fixture(path, pose):
+    """Run a video through MediaPipe once and keep its landmarks as a fixture"""
+    from core.batch import process_source, open_file
+    from core.pose_estimator import PoseEstimator
+
+    source = open_file(path)
+    estimator = PoseEstimator()
+    try:
+        result = process_source(source, estimator)
+    finally:
+        source.release()
+        estimator.close()
+    w, h = result['size']
+    name = "recorded_" + os.path.splitext(os.path.basename(path))[0]
+    save_fixture(name, result['landmarks'], {
+        'pose': pose, 'width': w, 'height': h, 'fps': source.fps,
+        'source': os.path.basename(path),
+    })
+    print(f"wrote {name}: {result['frames']} frames")
+
+
+def load_fixtures():
+    fixtures = {}
+    if not os.path.isdir(FIXTURE_DIR):
+        return fixtures
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if name.endswith(".npy"):
+            base = name[:-4]
+            with open(os.path.join(FIXTURE_DIR, base + ".json")) as f:
+                meta = json.load(f)
+            fixtures[base] = (np.load(os.path.join(FIXTURE_DIR, name)), meta)
+    return fixtures
+
+
+# === Benchmarks ===
+# Each returns (op, frames per op); op is called repeatedly and must be cheap to repeat.
+
+def normalized(landmarks, width, height):
+    """Frames with a pose, back in MediaPipe's normalized coordinates"""
+    rows = landmarks[~np.isnan(landmarks[:, 0, 0])].copy()
+    rows[:, :, 0] /= width
+    rows[:, :, 1] /= height
+    return rows
+
+
+class Cycle:
+    """Endless walk over the rows of an array"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.i = 0
+
+    def next(self):
+        row = self.rows[self.i]
+        self.i = (self.i + 1) % len(self.rows)
+        return row
+
+
+def bench_analyze(landmarks, meta, draw=False):
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(meta['pose'])
+    frame = LandmarkFrame()
+    w, h = meta['width'], meta['height']
+    rows = Cycle(normalized(landmarks, w, h))
+    image = np.zeros((h, w, 3), dtype=np.uint8) if draw else None
+
+    def op():
+        frame.fill_normalized(rows.next(), w, h)
+        analyzer.analyze(frame, w, h, image)
+    return op, 1
+
+
+def bench_analyze_sequence(landmarks, meta):
+    analyzer = MultiPoseAnalyzer()
+    return (lambda: analyzer.analyze_sequence(landmarks, meta['width'], meta['height'],
+                                              meta['pose'])), len(landmarks)
+
+
+def bench_one_euro(landmarks, meta):
+    metric = MultiPoseAnalyzer().analyze_sequence(
+        landmarks, meta['width'], meta['height'], meta['pose'])['primary_metric']
+    values = Cycle(np.nan_to_num(metric).tolist())
+    f = OneEuro(freq=meta['fps'] or 30)
+    return (lambda: f(values.next())), 1
+
+
+def bench_one_euro_bank(landmarks, meta):
+    rows = Cycle(np.nan_to_num(landmarks[:, :, :3]))
+    f = OneEuroBank(freq=meta['fps'] or 30, min_cutoff=LANDMARK_MIN_CUTOFF, beta=LANDMARK_BETA)
+    return (lambda: f(rows.next())), 1
+
+
+def bench_kalman2d(landmarks, meta):
+    wrists = Cycle(np.nan_to_num(landmarks[:, 15, :2]))
+    kf = Kalman2D(dt=1 / (meta['fps'] or 30))
+
+    def op():
+        kf.predict()
+        kf.update(wrists.next())
+    return op, 1
+
+
+def bench_kalman_bank(landmarks, meta):
+    rows = Cycle(landmarks[:, :, :2].astype(np.float64))
+    bank = KalmanBank(landmarks.shape[1], dt=1 / (meta['fps'] or 30))
+    bank.initialize(np.nan_to_num(landmarks[0, :, :2]))
+
+    def op():
+        bank.predict()
+        bank.update(rows.next())
+    return op, 1
+
+
+def bench_rts(landmarks, meta):
+    return (lambda: rts_smooth(landmarks[:, :, :2], dt=1 / (meta['fps'] or 30),
+                               process_var=OFFLINE_PROCESS_VAR)), len(landmarks)
+
+
+def bench_session(landmarks, meta):
+    metric = MultiPoseAnalyzer().analyze_sequence(
+        landmarks, meta['width'], meta['height'], meta['pose'])['primary_metric']
+    values = Cycle([float(v) for v in metric if not np.isnan(v)])
+    session = PoseSession()
+    return (lambda: session.update_best(values.next())), 1
+
+
+def bench_skeleton(landmarks, meta):
+    w, h = meta['width'], meta['height']
+    results = Cycle([array_to_results(row) for row in normalized(landmarks, w, h)[:60]])
+    image = np.zeros((h, w, 3), dtype=np.uint8)
+    drawing, connections = mp.solutions.drawing_utils, mp.solutions.pose.POSE_CONNECTIONS
+    return (lambda: drawing.draw_landmarks(image, results.next().pose_landmarks,
+                                           connections)), 1
+
+
+def bench_hud(landmarks, meta):
+    stats = LatencyStats()  # text refreshed twice a second, as in the GUI
+    for stage in ('capture', 'color', 'inference', 'skeleton', 'analysis', 'resize', 'display'):
+        for v in np.linspace(0.001, 0.03, 50):
+            stats.record(stage, v)
+    image = np.zeros((meta['height'], meta['width'], 3), dtype=np.uint8)
+    return (lambda: stats.draw_hud(image)), 1
+
+
+# name: (factory, per fixture?) - shared benchmarks run on the first fixture only
+BENCHMARKS = {
+    'analyze': (bench_analyze, True),
+    'analyze_sequence': (bench_analyze_sequence, True),
+    'filter.one_euro': (bench_one_euro, False),
+    'filter.one_euro_bank': (bench_one_euro_bank, False),
+    'filter.kalman2d': (bench_kalman2d, False),
+    'filter.kalman_bank': (bench_kalman_bank, False),
+    'filter.rts_smooth': (bench_rts, False),
+    'session.update_best': (bench_session, False),
+    'render.analyzer_overlay': (lambda l, m: bench_analyze(l, m, draw=True), True),
+    'render.skeleton': (bench_skeleton, False),
+    'render.latency_hud': (bench_hud, False),
+}
+
+
+def measure(op, min_time=0.2, repeat=5):
+    """Best-of-repeat calls/sec, each repeat running for about min_time seconds"""
+    op()  # warm up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        loops *= 10
+    loops = max(1, int(loops * (min_time / max(elapsed, 1e-9))))
+
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        best = max(best, loops / (time.perf_counter() - start))
+    return best
+
+
+def allocations(op, calls=20):
+    """Peak bytes allocated (and not yet freed) during one call, median of several"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            op()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return int(np.median(peaks))
+
+
+def run(fixtures, name_filter=None, min_time=0.2):
+    results = {}
+    first = next(iter(fixtures))
+    for bench, (factory, per_fixture) in BENCHMARKS.items():
+        for fixture in (fixtures if per_fixture else [first]):
+            name = f"{bench}[{fixture}]"
+            if name_filter and name_filter not in name:
+                continue
+            landmarks, meta = fixtures[fixture]
+            op, frames = factory(landmarks, meta)
+            if name.startswith(NOISY):
+                ops = measure(op, min_time * NOISY_TIME_FACTOR, NOISY_REPEAT)
+            else:
+                ops = measure(op, min_time)
+            results[name] = {
+                'ops_per_sec': ops,
+                'frames_per_sec': ops * frames,
+                'alloc_bytes': allocations(op),
+            }
+            print(f"{name:<55}{ops * frames:>14,.0f} frames/s"
+                  f"{results[name]['alloc_bytes']:>12,d} B/op")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the comparison and return the names of regressed benchmarks"""
+    regressions = []
+    print(f"\n{'benchmark':<55}{'change':>9}{'alloc B/op':>26}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if b is None:
+            print(f"{name:<55}{'new':>9}")
+            continue
+        change = r['ops_per_sec'] / b['ops_per_sec'] - 1
+        alloc = f"{b['alloc_bytes']:,d}->{r['alloc_bytes']:,d}"
+        slower = change < -(tolerance * 2 if name.startswith(NOISY) else tolerance)
+        # allocations are deterministic, allow a little slack for interpreter noise
+        more_memory = r['alloc_bytes'] > b['alloc_bytes'] * 1.5 + 1024
+        flag = "  REGRESSION" if slower or more_memory else ""
+        print(f"{name:<55}{change:>+9.0%}{alloc:>26}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flexibility Progress Tracker benchmarks")
+    parser.add_argument("--make-fixtures", action="store_true",
+                        help="regenerate the synthetic landmark fixtures")
+    parser.add_argument("--record", metavar="VIDEO",
+                        help="add a fixture recorded from VIDEO with MediaPipe")
+    parser.add_argument("--pose", choices=["front_split", "forward_fold"], default="front_split",
+                        help="pose shown in the --record video")
+    parser.add_argument("--filter", default=None, metavar="TEXT",
+                        help="only run benchmarks whose name contains TEXT")
+    parser.add_argument("--min-time", type=float, default=0.2, metavar="S",
+                        help="seconds per timing repeat")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed ops/sec drop against the baseline (fraction)")
+    parser.add_argument("--baseline", default=BASELINE, metavar="JSON",
+                        help="baseline file to compare with / update")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write these results as the new baseline")
+    parser.add_argument("--output", default=None, metavar="JSON",
+                        help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        make_fixtures()
+        return
+    if args.record:
+        record_fixture(args.record, args.pose)
+        return
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        sys.exit("No fixtures found, run with --make-fixtures first")
+
+    results = run(fixtures, args.filter, args.min_time)
+    report = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor() or platform.machine(),
+                    'numpy': np.__version__},
+        'benchmarks': results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline yet, run with --update-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline['benchmarks'], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) REGRESSED against {args.baseline} "
+              f"(baseline machine: {baseline['machine']['platform']})")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
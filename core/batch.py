@@ -0,0 +1,208 @@
+"""
+Headless batch processing.
+Runs a video file or image folder through the estimator and analyzer as fast as
+the CPU allows: decoding and inference overlap in a Pipeline, nothing is
+displayed and nothing is paced. Metrics are computed for the whole recording at
+once with analyze_sequence, after zero-lag (RTS) smoothing of the landmarks.
+"""
+
+import csv
+import time
+
+import numpy as np
+
+from core.landmark_cache import CachingEstimator
+from core.landmarks import LandmarkFrame
+from core.pipeline import Pipeline
+from core.sources import file_source
+from filters.kalman2D import rts_smooth
+
+# Process noise for the offline smoother: loose enough to follow fast movements
+# into their peaks, the backward pass removes the jitter
+OFFLINE_PROCESS_VAR = 5.0
+
+
+def smooth_recording(landmarks, fps=None, timestamps=None):
+    """Zero-lag smoothing of the x, y columns of a (T, 33, 4) pixel landmark array, in place"""
+    if timestamps is not None and any(t is None for t in timestamps):
+        timestamps = None
+    landmarks[:, :, :2] = rts_smooth(landmarks[:, :, :2], dt=1 / (fps or 30),
+                                     process_var=OFFLINE_PROCESS_VAR,
+                                     timestamps=timestamps)
+    return landmarks
+
+
+def sequence_best(metrics, min_confidence=0.5):
+    """Peak primary metric over the confident frames of analyze_sequence output, or None"""
+    primary = metrics['primary_metric'][metrics['confidence'] > min_confidence]
+    primary = primary[~np.isnan(primary)]
+    return float(primary.max()) if len(primary) else None
+
+
+def analyze_landmarks(result, analyzer, fps=None, smooth=True, min_confidence=0.5):
+    """
+    Fill in result['metrics'] and result['best'] from result['landmarks'] with the
+    analyzer's current pose. smooth only applies to timed sources (fps known).
+    """
+    P = result['landmarks']
+    if not len(P):
+        return result
+    if smooth and fps:
+        smooth_recording(P, fps, result['timestamps'])
+    w, h = result['size']
+    result['metrics'] = analyzer.analyze_sequence(P, w, h)
+    result['best'] = sequence_best(result['metrics'], min_confidence)
+    return result
+
+
+def process_source(source, estimator, analyzer=None, smooth=True, min_confidence=0.5):
+    """
+    Estimate every frame of source, then analyze the recording with the
+    analyzer's current pose (skipped without an analyzer, e.g. for video chunks
+    that are stitched together first).
+    Returns a dict with 'frames', 'elapsed', 'fps', 'size', 'landmarks' (T, 33, 4),
+    'timestamps', 'metrics' (analyze_sequence output) and 'best'.
+    """
+    frame = LandmarkFrame()
+    landmarks = []
+    timestamps = []
+    size = [None]
+
+    def inference_stage(item):
+        _, item['results'] = estimator.process_frame(item['frame'], item['timestamp'])
+        return item
+
+    def record_stage(item):
+        h, w = item['frame'].shape[:2]
+        if frame.fill_from_results(item['results'], w, h):
+            landmarks.append(frame.data.copy())
+        else:
+            landmarks.append(np.full_like(frame.data, np.nan))
+        timestamps.append(item['timestamp'])
+        if size[0] is None:
+            size[0] = (w, h)
+        return None  # nothing for latest(), everything is recorded here
+
+    # Every frame must be processed, and in order
+    pipeline = Pipeline(source, [inference_stage, record_stage], drop_frames=False)
+    start = time.perf_counter()
+    pipeline.start()
+    try:
+        while not pipeline.finished and pipeline.error is None:
+            time.sleep(0.005)
+    finally:
+        pipeline.stop()
+    elapsed = time.perf_counter() - start
+    if pipeline.error is not None:
+        raise pipeline.error
+
+    result = {
+        'frames': len(landmarks),
+        'elapsed': elapsed,
+        'fps': len(landmarks) / elapsed if elapsed > 0 else 0.0,
+        'size': size[0],
+        'landmarks': (np.stack(landmarks) if landmarks
+                      else np.empty((0,) + frame.data.shape, dtype=np.float32)),
+        'timestamps': timestamps,
+        'metrics': None,
+        'best': None,
+    }
+    if analyzer is not None:
+        analyze_landmarks(result, analyzer, getattr(source, 'fps', None), smooth, min_confidence)
+    return result
+
+
+def open_file(path, start_frame=0, end_frame=None):
+    """file_source that raises IOError if a video can't be opened"""
+    source = file_source(path, start_frame, end_frame)
+    if getattr(source, 'cap', None) is not None and not source.cap.isOpened():
+        source.release()
+        raise IOError(f"cannot open {path}")
+    return source
+
+
+def process_file(path, estimator, analyzer, cache=None, smooth=True, min_confidence=0.5):
+    """
+    process_source for a video file or recording, through the landmark cache if
+    given: a hit is analyzed straight from the cached landmarks without opening
+    the file, a miss is stored for next time.
+    """
+    active = estimator
+    if cache is not None:
+        active = CachingEstimator(estimator, cache, path)
+        if active.hit:
+            return analyze_landmarks(active.result(), analyzer, active.meta['fps'],
+                                     smooth, min_confidence)
+    source = open_file(path)
+    try:
+        result = process_source(source, active, analyzer, smooth, min_confidence)
+    finally:
+        source.release()
+    if active is not estimator:
+        active.finish(fps=source.fps)
+    return result
+
+
+def process_range(path, estimator, start=0, stop=None, warmup=0):
+    """
+    Landmarks for frames [start, stop) of a video file or recording, without analysis.
+    Decoding starts `warmup` frames early, from a reset estimator, so tracking
+    has settled by the first frame that is kept; the warm-up frames are dropped.
+    The result also carries 'first_frame' and the file's 'source_fps'.
+    """
+    if hasattr(estimator, 'reset'):
+        estimator.reset()
+    first = max(0, start - warmup)
+    source = open_file(path, first, stop)
+    try:
+        result = process_source(source, estimator)
+    finally:
+        source.release()
+    skip = start - first
+    result['landmarks'] = result['landmarks'][skip:]
+    result['timestamps'] = result['timestamps'][skip:]
+    result['frames'] = len(result['landmarks'])
+    result['first_frame'] = start
+    result['source_fps'] = source.fps
+    return result
+
+
+def _metric_columns(result):
+    metrics = result['metrics']
+    columns = [k for k, v in metrics.items() if isinstance(v, np.ndarray)]
+    return columns, list(metrics.get('feedback', {}))
+
+
+def _metric_rows(result, columns, feedback):
+    metrics = result['metrics']
+    first = result.get('first_frame', 0)
+    for i in range(result['frames']):
+        t = result['timestamps'][i]
+        yield ([first + i, '' if t is None else f"{t:.3f}"]
+               + [f"{metrics[k][i]:.3f}" for k in columns]
+               + [int(metrics['feedback'][k][i]) for k in feedback])
+
+
+def write_metrics_csv(path, result):
+    """One row per frame: index, timestamp, every numeric metric and the feedback flags"""
+    if result['metrics'] is None:
+        return
+    columns, feedback = _metric_columns(result)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(['frame', 'timestamp'] + columns + feedback)
+        writer.writerows(_metric_rows(result, columns, feedback))
+
+
+def write_merged_metrics_csv(path, results):
+    """Like write_metrics_csv for several results of one pose, with a leading 'source' column"""
+    results = [r for r in results if r.get('metrics') is not None]
+    if not results:
+        return
+    columns, feedback = _metric_columns(results[0])
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(['source', 'frame', 'timestamp'] + columns + feedback)
+        for result in results:
+            for row in _metric_rows(result, columns, feedback):
+                writer.writerow([result['path']] + row)
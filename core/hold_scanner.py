@@ -0,0 +1,144 @@
+"""
+Coarse-to-fine search for pose holds in long recordings.
+Pass 1 samples the video a few times per second with a cheap (downscaled)
+estimator and marks the samples where the selected pose is held with
+confidence. Pass 2 runs the full-quality estimator at full frame rate only
+inside those intervals, so warm-up and talking are never analyzed in detail.
+"""
+
+import time
+
+import numpy as np
+
+from core.batch import open_file, process_range, analyze_landmarks
+from core.landmarks import LandmarkFrame
+from core.pose_estimator import PoseEstimator
+
+# When does a frame show the pose (not just a person)? Applied to analyze_sequence output
+HOLD_CRITERIA = {
+    'front_split': lambda m: m['hip_opening_angle'] > 90,   # legs spread apart
+    'forward_fold': lambda m: m['hip_flexion'] < 120,       # bent at the hips
+}
+
+
+class HoldScanner:
+    """
+    Usage:
+        scanner = HoldScanner(analyzer)  # analyzer's current pose is searched for
+        scan = scanner.scan("class.mp4")
+        scan['segments']  # analyzed results for each hold, scan['best'] over all
+
+    sample_interval: seconds between pass-1 samples.
+    min_hits: samples that must agree before an interval counts as a hold.
+    max_gap: samples without the pose that may interrupt one hold.
+    warmup: frames decoded ahead of each interval in pass 2 to settle tracking.
+    """
+
+    def __init__(self, analyzer, coarse_estimator=None, fine_estimator=None,
+                 sample_interval=0.5, min_confidence=0.5, min_hits=2, max_gap=1,
+                 warmup=15, smooth=True):
+        self.analyzer = analyzer
+        self.coarse_estimator = coarse_estimator or PoseEstimator(input_scale=0.5)
+        self.fine_estimator = fine_estimator or PoseEstimator()
+        self.sample_interval = sample_interval
+        self.min_confidence = min_confidence
+        self.min_hits = min_hits
+        self.max_gap = max_gap
+        self.warmup = warmup
+        self.smooth = smooth
+
+    def coarse_pass(self, path):
+        """
+        Sample every `stride` frames (skipped frames are only grabbed, never
+        converted or analyzed). Returns (sample frame indices, present mask,
+        total frames, stride).
+        """
+        source = open_file(path)
+        fps = source.fps or 30
+        stride = max(1, int(round(fps * self.sample_interval)))
+
+        if hasattr(self.coarse_estimator, 'reset'):
+            self.coarse_estimator.reset()
+        frame = LandmarkFrame()
+        samples, rows = [], []
+        size = None
+        index = 0
+        try:
+            while True:
+                if index % stride:
+                    if not source.grab():
+                        break
+                    index += 1
+                    continue
+                ret, image = source.read()
+                if not ret:
+                    break
+                h, w = image.shape[:2]
+                size = (w, h)
+                _, results = self.coarse_estimator.process_frame(image, source.last_timestamp)
+                if frame.fill_from_results(results, w, h):
+                    rows.append(frame.data.copy())
+                else:
+                    rows.append(np.full_like(frame.data, np.nan))
+                samples.append(index)
+                index += 1
+        finally:
+            source.release()
+
+        present = np.zeros(len(samples), dtype=bool)
+        if samples:
+            metrics = self.analyzer.analyze_sequence(np.stack(rows), *size)
+            criterion = HOLD_CRITERIA.get(self.analyzer.current_pose, lambda m: True)
+            with np.errstate(invalid='ignore'):
+                present = (metrics['confidence'] > self.min_confidence) & criterion(metrics)
+        return np.array(samples), present, index, stride
+
+    def intervals(self, samples, present, total, stride):
+        """Frame ranges [start, stop) around runs of present samples, padded by one stride"""
+        runs = []
+        for i in np.flatnonzero(present):
+            if runs and i - runs[-1][1] <= self.max_gap + 1:
+                runs[-1][1] = i
+                runs[-1][2] += 1
+            else:
+                runs.append([i, i, 1])
+
+        ranges = []
+        for first, last, hits in runs:
+            if hits < self.min_hits:
+                continue
+            # The hold may start and end anywhere between two samples
+            start = max(0, samples[first] - stride + 1)
+            stop = min(total, samples[last] + stride)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], stop)
+            else:
+                ranges.append((start, stop))
+        return ranges
+
+    def scan(self, path):
+        """Both passes over one video. Returns a dict with the segments and the work done."""
+        start_time = time.perf_counter()
+        samples, present, total, stride = self.coarse_pass(path)
+        ranges = self.intervals(samples, present, total, stride)
+
+        segments = []
+        for start, stop in ranges:
+            result = process_range(path, self.fine_estimator, start, stop, self.warmup)
+            result['path'] = path
+            analyze_landmarks(result, self.analyzer, result['source_fps'],
+                              self.smooth, self.min_confidence)
+            segments.append(result)
+
+        bests = [s['best'] for s in segments if s['best'] is not None]
+        fine_frames = sum(s['frames'] for s in segments)
+        return {
+            'path': path,
+            'segments': segments,
+            'best': max(bests) if bests else None,
+            'total_frames': total,
+            'coarse_frames': len(samples),
+            # frames run through the full estimator, warm-up included
+            'fine_frames': fine_frames + sum(min(self.warmup, s) for s, _ in ranges),
+            'elapsed': time.perf_counter() - start_time,
+        }
@@ -0,0 +1,107 @@
+"""
+Inference frame-skipping.
+Runs MediaPipe only on keyframes (every N frames, or whenever the per-frame
+latency budget allows) and predicts landmarks in between with constant-velocity
+Kalman filters, so analysis and overlays still run at full display rate.
+"""
+
+import time
+
+import numpy as np
+
+from core.pose_estimator import NUM_LANDMARKS, landmarks_to_array, array_to_results, draw_skeleton
+from filters.kalman2D import KalmanBank
+
+
+class KeyframeEstimator:
+    """
+    Wraps a PoseEstimator (or ProcessPoseEstimator) and keeps its process_frame contract.
+    Pass frame timestamps (seconds) to process_frame so predictions follow the
+    real frame rate; otherwise frames are assumed to be dt apart.
+    every_n: run inference on every Nth frame
+    latency_budget: seconds per frame available for inference; when set, inference
+        runs whenever the accumulated budget covers the measured inference time
+        and every_n is ignored
+    """
+
+    def __init__(self, estimator, every_n=2, latency_budget=None, dt=1/30):
+        self.estimator = estimator
+        self.every_n = max(1, int(every_n))
+        self.latency_budget = latency_budget
+        self.dt = dt
+
+        self.filters = None      # KalmanBank over all landmarks, in pixel space
+        self.last = None         # last keyframe landmarks (33, 4), normalized
+        self.frames_since_key = 0
+        self.infer_time = 0.0    # rolling average inference time (s)
+        self.credit = 0.0        # accumulated latency budget (s)
+
+        # Counters
+        self.keyframes = 0
+        self.predicted_frames = 0
+
+    def settings(self):
+        return dict(self.estimator.settings(), every_n=self.every_n,
+                    latency_budget=self.latency_budget)
+
+    def reset(self):
+        self.filters = None
+        self.last = None
+        self.frames_since_key = 0
+        self.credit = 0.0
+
+    def _is_keyframe(self):
+        if self.last is None:
+            return True
+        if self.latency_budget is None:
+            return self.frames_since_key + 1 >= self.every_n
+        return self.credit >= self.infer_time
+
+    def process_frame(self, frame, timestamp=None):
+        h, w = frame.shape[:2]
+        scale = np.array([w, h], dtype=np.float64)
+
+        if self.latency_budget is not None:
+            # Unused budget carries over, but only for a couple of frames
+            self.credit = min(self.credit + self.latency_budget, 2 * max(self.latency_budget, self.infer_time))
+
+        # Advance every filter by one frame
+        if self.filters is not None:
+            predicted = self.filters.predict(timestamp)
+
+        if self._is_keyframe():
+            start = time.perf_counter()
+            image, results = self.estimator.process_frame(frame, timestamp)
+            elapsed = time.perf_counter() - start
+            self.infer_time = elapsed if self.keyframes == 0 else 0.8 * self.infer_time + 0.2 * elapsed
+            self.credit = max(0.0, self.credit - elapsed)
+            self.keyframes += 1
+            self.frames_since_key = 0
+
+            if not results.pose_landmarks:
+                self.reset()
+                return image, results
+
+            self.last = landmarks_to_array(results.pose_landmarks)
+            measured = self.last[:, :2] * scale
+            if self.filters is None:
+                self.filters = KalmanBank(NUM_LANDMARKS, dt=self.dt)
+                self.filters.initialize(measured, timestamp)
+            else:
+                self.filters.update(measured)
+            return image, results
+
+        # In-between frame: use the filters' prediction
+        self.frames_since_key += 1
+        self.predicted_frames += 1
+        landmarks = self.last.copy()
+        landmarks[:, :2] = predicted / scale
+        results = array_to_results(landmarks)
+        results.predicted = True
+
+        image = frame.copy()
+        draw_skeleton(image, landmarks)
+        return image, results
+
+    def close(self):
+        self.estimator.close()
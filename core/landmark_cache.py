@@ -0,0 +1,186 @@
+"""
+On-disk landmark cache for video files, keyed by file identity + estimator settings.
+Entries are (T, 33, 4) normalized landmark .npy files (NaN rows = no pose) with a .json sidecar.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from core.landmarks import NUM_LANDMARKS
+from core.pose_estimator import landmarks_to_array, array_to_results, draw_skeleton
+
+
+def file_identity(path, chunk_size=1 << 20):
+    """SHA-1 of the size, mtime and first and last chunk: cheap even for huge recordings"""
+    stat = os.stat(path)
+    h = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(chunk_size))
+        if stat.st_size > chunk_size:
+            f.seek(max(chunk_size, stat.st_size - chunk_size))
+            h.update(f.read(chunk_size))
+    return h.hexdigest()
+
+
+class LandmarkCache:
+    def __init__(self, directory="data/landmark_cache", max_bytes=2 * 1024**3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, path, settings):
+        settings_str = json.dumps(settings, sort_keys=True)
+        settings_hash = hashlib.sha1(settings_str.encode()).hexdigest()[:16]
+        return f"{file_identity(path)}_{settings_hash}"
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".npy", base + ".json"
+
+    def load(self, key):
+        """Return (landmarks, meta) for a cached entry or None. landmarks is memory-mapped."""
+        npy_path, json_path = self._paths(key)
+        if not (os.path.exists(npy_path) and os.path.exists(json_path)):
+            return None
+        with open(json_path) as f:
+            meta = json.load(f)
+        landmarks = np.load(npy_path, mmap_mode='r')
+        # Mark as recently used
+        os.utime(npy_path)
+        os.utime(json_path)
+        return landmarks, meta
+
+    def store(self, key, landmarks, meta):
+        npy_path, json_path = self._paths(key)
+        # Write to unique temp files first, so a crash never leaves a half-written
+        # entry and two writers of the same key never share a temp file
+        with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix=".tmp",
+                                         delete=False) as f:
+            np.save(f, np.asarray(landmarks, dtype=np.float32))
+        npy_tmp = f.name
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, suffix=".tmp",
+                                         delete=False) as f:
+            json.dump(meta, f)
+        os.replace(npy_tmp, npy_path)
+        os.replace(f.name, json_path)
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                npy_path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(npy_path)
+                except FileNotFoundError:
+                    continue  # evicted by another process meanwhile
+                entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for p in self._paths(key):
+                try:
+                    os.remove(p)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+class CachingEstimator:
+    """
+    Wraps an estimator for one video file, looked up in the cache on creation.
+    Hit: result() or replay() without running (or decoding) anything.
+    Miss: landmarks are recorded and stored by finish() after the last frame.
+    """
+
+    def __init__(self, estimator, cache, path):
+        self.estimator = estimator
+        self.cache = cache
+        self.path = path
+
+        self.key = cache.key(path, estimator.settings())
+        entry = cache.load(self.key)
+        self.cached, self.meta = entry if entry is not None else (None, None)
+        self.recorded = None if self.hit else []   # (33, 4) rows on a miss
+        self.timestamps = []
+        self.frame_size = None
+        self.index = 0
+
+    @property
+    def hit(self):
+        return self.cached is not None
+
+    def result(self):
+        """process_source-style result (pixel landmarks, no metrics yet) from a hit"""
+        start = time.perf_counter()
+        w, h = self.meta['width'], self.meta['height']
+        landmarks = np.array(self.cached)  # a writable copy, analysis smooths in place
+        landmarks[:, :, 0] *= w
+        landmarks[:, :, 1] *= h
+        elapsed = time.perf_counter() - start
+        return {
+            'frames': len(landmarks),
+            'elapsed': elapsed,
+            'fps': len(landmarks) / elapsed if elapsed > 0 else 0.0,
+            'size': (w, h),
+            'landmarks': landmarks,
+            'timestamps': self.meta['timestamps'],
+            'metrics': None,
+            'best': None,
+        }
+
+    def replay(self, index, frame):
+        """Annotated image + results for frame `index` of a hit"""
+        row = self.cached[index] if index < len(self.cached) else None
+        arr = None if row is None or np.isnan(row[0, 0]) else np.array(row)
+        image = frame.copy()
+        if arr is not None:
+            draw_skeleton(image, arr)
+        return image, array_to_results(arr)
+
+    def process_frame(self, frame, timestamp=None):
+        i = self.index
+        self.index += 1
+        if self.hit:
+            return self.replay(i, frame)
+
+        if self.frame_size is None:
+            self.frame_size = frame.shape[:2]
+        image, results = self.estimator.process_frame(frame, timestamp)
+        if self.recorded is not None:
+            if results.pose_landmarks:
+                self.recorded.append(landmarks_to_array(results.pose_landmarks))
+            else:
+                self.recorded.append(np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32))
+            self.timestamps.append(timestamp)
+        return image, results
+
+    def finish(self, fps=None):
+        """Store what was recorded; call only after the whole video was processed"""
+        if not self.recorded:
+            return
+        h, w = self.frame_size
+        meta = {
+            'source': os.path.basename(self.path),
+            'frames': len(self.recorded),
+            'width': w,
+            'height': h,
+            'fps': fps,
+            'timestamps': self.timestamps,
+            'settings': self.estimator.settings(),
+        }
+        self.cache.store(self.key, np.stack(self.recorded), meta)
+        self.recorded = None
+
+    def settings(self):
+        return self.estimator.settings()
+
+    def close(self):
+        pass  # the wrapped estimator is shared, its owner closes it
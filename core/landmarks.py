@@ -0,0 +1,56 @@
+"""
+Compact per-frame landmark storage shared by the analyzers and overlays.
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+
+
+class LandmarkFrame:
+    """
+    One frame of pose landmarks in a preallocated (33, 4) float32 array.
+    Columns: x and y in pixels, z (MediaPipe's relative depth) and visibility.
+    Allocate once and refill every frame.
+    """
+    __slots__ = ('data', 'width', 'height')
+
+    def __init__(self):
+        self.data = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.width = 0
+        self.height = 0
+
+    def fill(self, landmarks, width, height):
+        """Fill from a MediaPipe landmark list (results.pose_landmarks.landmark)"""
+        self.data[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+        self._to_pixels(width, height)
+
+    def fill_normalized(self, array, width, height):
+        """Fill from a (33, 4) array of normalized x, y, z, visibility"""
+        self.data[:] = array
+        self._to_pixels(width, height)
+
+    def fill_from_results(self, results, width, height):
+        """Fill from an estimator result, returns False when no pose was detected"""
+        array = getattr(results, 'landmark_array', None)
+        if array is not None:
+            self.fill_normalized(array, width, height)
+            return True
+        if not results.pose_landmarks:
+            return False
+        self.fill(results.pose_landmarks.landmark, width, height)
+        return True
+
+    def _to_pixels(self, width, height):
+        self.data[:, 0] *= width
+        self.data[:, 1] *= height
+        self.width = width
+        self.height = height
+
+    def xy(self, index):
+        """Pixel position of one landmark (a view into the frame array)"""
+        return self.data[index, :2]
+
+    @property
+    def visibility(self):
+        return self.data[:, 3]
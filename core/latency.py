@@ -0,0 +1,132 @@
+"""
+Per-stage latency instrumentation.
+Stages record their durations (monotonic perf_counter) into fixed-size ring
+buffers; rolling p50/p95/p99 come from the last `window` samples of each
+stage. Can be drawn as a HUD onto frames and exported to JSON.
+"""
+
+import json
+import threading
+import time
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+# Capture-to-display time of a frame; spans every pipeline stage
+END_TO_END = 'total'
+
+
+class _Timer:
+    __slots__ = ('stats', 'stage', 'start')
+
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+def timed(stats, stage):
+    """`with timed(stats, 'inference'):` - a no-op when stats is None"""
+    return nullcontext() if stats is None else _Timer(stats, stage)
+
+
+class LatencyStats:
+    """
+    Usage:
+        stats = LatencyStats()
+        with stats.time('inference'):
+            ...
+        stats.record('display', seconds)
+        stats.summary()  # {stage: {'p50': ms, 'p95': ms, 'p99': ms, ...}}
+
+    Safe to record from several threads (pipeline stages).
+    """
+
+    def __init__(self, window=300, hud_interval=0.5):
+        self.window = window
+        self.hud_interval = hud_interval
+        self.buffers = {}   # stage -> (window,) seconds, ring
+        self.counts = {}    # stage -> samples recorded in total
+        self.order = []     # stages in the order they first reported
+        self._lock = threading.Lock()
+        self._hud = []
+        self._hud_time = 0.0
+
+    def time(self, stage):
+        return _Timer(self, stage)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            buf = self.buffers.get(stage)
+            if buf is None:
+                buf = self.buffers[stage] = np.zeros(self.window)
+                self.counts[stage] = 0
+                self.order.append(stage)
+            buf[self.counts[stage] % self.window] = seconds
+            self.counts[stage] += 1
+
+    def samples(self, stage):
+        """Last (up to window) durations of a stage in seconds, unordered"""
+        with self._lock:
+            n = min(self.counts.get(stage, 0), self.window)
+            return self.buffers[stage][:n].copy() if n else np.empty(0)
+
+    def summary(self):
+        """Rolling stats per stage, in milliseconds"""
+        result = {}
+        for stage in list(self.order):
+            s = self.samples(stage) * 1000.0
+            p50, p95, p99 = np.percentile(s, PERCENTILES)
+            result[stage] = {
+                'p50': p50, 'p95': p95, 'p99': p99,
+                'mean': s.mean(), 'max': s.max(),
+                'count': self.counts[stage],
+            }
+        return result
+
+    def hud_lines(self):
+        """Text for the HUD, recomputed at most every hud_interval seconds"""
+        now = time.monotonic()
+        if now - self._hud_time >= self.hud_interval:
+            self._hud_time = now
+            self._hud = [f"{stage:<10}{s['p50']:6.1f}{s['p95']:6.1f}{s['p99']:6.1f}"
+                         for stage, s in self.summary().items()]
+            if self._hud:
+                self._hud.insert(0, f"{'ms':<10}{'p50':>6}{'p95':>6}{'p99':>6}")
+        return self._hud
+
+    def draw_hud(self, image, origin=(10, 20), line_height=16):
+        """Draw the rolling percentiles onto a BGR image in place"""
+        x, y = origin
+        for line in self.hud_lines():
+            cv2.putText(image, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0,
+                        (0, 0, 0), 3, cv2.LINE_AA)
+            cv2.putText(image, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+            y += line_height
+
+    def export(self, path, frame_budget=None, **extra):
+        """
+        Write the summary (ms) to a JSON file. Stages run concurrently, so the
+        slowest one sets the frame rate: any stage whose p95 exceeds frame_budget
+        (seconds) is listed under 'over_budget' (end-to-end latency is not).
+        extra: further top-level entries, e.g. motion_gate=gate.stats().
+        """
+        summary = self.summary()
+        data = dict(extra, window=self.window, stages=summary)
+        if frame_budget is not None:
+            budget_ms = frame_budget * 1000.0
+            data['frame_budget_ms'] = budget_ms
+            data['over_budget'] = [stage for stage, s in summary.items()
+                                   if stage != END_TO_END and s['p95'] > budget_ms]
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2, default=float)
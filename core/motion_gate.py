@@ -0,0 +1,83 @@
+"""
+Motion-gated inference.
+During holds the subject barely moves, so a cheap low-resolution frame
+difference decides whether MediaPipe needs to run again; otherwise the last
+landmarks are reused and inference only refreshes at a reduced rate.
+"""
+
+import cv2
+import mediapipe as mp
+
+
+class MotionGatedEstimator:
+    """
+    Wraps an estimator and keeps its process_frame contract.
+    threshold: mean absolute grey-level difference (0-255) against the last
+        inferred frame below which the frame counts as still
+    reinfer_every: while still, run inference at least every N frames anyway
+    size: resolution the motion score is computed at
+    """
+
+    def __init__(self, estimator, threshold=2.0, reinfer_every=10, size=(64, 48)):
+        self.estimator = estimator
+        self.threshold = threshold
+        self.reinfer_every = max(1, int(reinfer_every))
+        self.size = size
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+
+        self.reference = None    # small grey frame from the last inference
+        self.last_results = None
+        self.frames_since_infer = 0
+        self.motion_score = 0.0
+
+        # Counters
+        self.inferences_run = 0
+        self.inferences_saved = 0
+
+    def _small_grey(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def process_frame(self, frame, timestamp=None):
+        grey = self._small_grey(frame)
+        if self.reference is not None:
+            self.motion_score = float(cv2.absdiff(grey, self.reference).mean())
+
+        still = (self.reference is not None
+                 and self.last_results is not None
+                 and self.last_results.pose_landmarks is not None
+                 and self.motion_score < self.threshold
+                 and self.frames_since_infer + 1 < self.reinfer_every)
+
+        if still:
+            self.frames_since_infer += 1
+            self.inferences_saved += 1
+            image = frame.copy()
+            self.mp_drawing.draw_landmarks(
+                image, self.last_results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS
+            )
+            return image, self.last_results
+
+        image, results = self.estimator.process_frame(frame, timestamp)
+        self.reference = grey
+        self.last_results = results
+        self.frames_since_infer = 0
+        self.inferences_run += 1
+        return image, results
+
+    def stats(self):
+        total = self.inferences_run + self.inferences_saved
+        return {
+            'inferences_run': self.inferences_run,
+            'inferences_saved': self.inferences_saved,
+            'saved_fraction': self.inferences_saved / total if total else 0.0,
+            'motion_score': self.motion_score,
+        }
+
+    def settings(self):
+        return dict(self.estimator.settings(), motion_threshold=self.threshold,
+                    reinfer_every=self.reinfer_every)
+
+    def close(self):
+        self.estimator.close()
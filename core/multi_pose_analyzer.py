@@ -6,15 +6,36 @@ Extensible framework for adding new pose types
 import numpy as np
 import cv2
 
+from core.landmarks import LandmarkFrame
+
+FOLD_KEY_LANDMARKS = np.array([11, 12, 23, 24, 25, 26])
+
+# Derived key points appended after the 33 landmarks by PoseAnalyzer.keypoints()
+HIP_CENTER, SHOULDER_CENTER, KNEE_CENTER, WRIST_CENTER, HIP_VERTICAL = 33, 34, 35, 36, 37
+_CENTER_PAIRS = [(23, 24), (11, 12), (25, 26), (15, 16), (23, 24)]
+CENTER_WEIGHTS = np.zeros((len(_CENTER_PAIRS), 33), dtype=np.float32)
+for _row, _pair in enumerate(_CENTER_PAIRS):
+    CENTER_WEIGHTS[_row, list(_pair)] = 0.5
+
+# Angle triples (a, b, c) -> angle at b, for left leg in front and right leg in front:
+# hip flexor, hip opening, front knee, back knee
+SPLIT_TRIPLES = (
+    np.array([[27, 23, SHOULDER_CENTER], [27, HIP_CENTER, 28], [23, 25, 27], [24, 26, 28]]),
+    np.array([[28, 24, SHOULDER_CENTER], [28, HIP_CENTER, 27], [24, 26, 28], [23, 25, 27]]),
+)
+# torso angle (from vertical), hip flexion
+FOLD_TRIPLES = np.array([[HIP_VERTICAL, HIP_CENTER, SHOULDER_CENTER],
+                         [SHOULDER_CENTER, HIP_CENTER, KNEE_CENTER]])
+
 class PoseAnalyzer:
     """Base analyzer with common angle/distance calculations"""
     
     @staticmethod
     def calculate_angle(a, b, c):
         """Calculate angle at point b formed by points a-b-c"""
-        a = np.array(a)
-        b = np.array(b)
-        c = np.array(c)
+        a = np.asarray(a)
+        b = np.asarray(b)
+        c = np.asarray(c)
         
         radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
         angle = np.abs(radians * 180.0 / np.pi)
@@ -27,16 +48,16 @@ class PoseAnalyzer:
     @staticmethod
     def calculate_distance(p1, p2):
         """Calculate Euclidean distance between two points"""
-        p1 = np.array(p1)
-        p2 = np.array(p2)
+        p1 = np.asarray(p1)
+        p2 = np.asarray(p2)
         return np.linalg.norm(p1 - p2)
     
     @staticmethod
     def point_to_line_distance(point, line_start, line_end):
         """Calculate perpendicular distance from point to line"""
-        point = np.array(point)
-        line_start = np.array(line_start)
-        line_end = np.array(line_end)
+        point = np.asarray(point)
+        line_start = np.asarray(line_start)
+        line_end = np.asarray(line_end)
         
         # Vector from line_start to line_end
         line_vec = line_end - line_start
@@ -54,6 +75,32 @@ class PoseAnalyzer:
         
         return np.linalg.norm(point - proj)
 
+    # === Batched: (N, 2) or (N, 3) arrays in, (N,) arrays out ===
+
+    @staticmethod
+    def calculate_angles(a, b, c):
+        """Angles (degrees, 0-180) at points b formed by a-b-c, for many triples at once"""
+        u = np.asarray(a) - b
+        v = np.asarray(c) - b
+        dot = np.einsum('...i,...i->...', u, v)
+        if u.shape[-1] == 2:
+            cross = np.abs(u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0])
+        else:
+            cross = np.linalg.norm(np.cross(u, v), axis=-1)
+        return np.degrees(np.arctan2(cross, dot))
+
+    @staticmethod
+    def keypoints(data):
+        """
+        (..., 33, 4) landmark data -> (..., 38, 2) pixel points: the 33 landmarks
+        followed by hip, shoulder, knee and wrist centers and a point straight
+        above the hip center (see HIP_CENTER etc.)
+        """
+        xy = data[..., :2]
+        points = np.concatenate((xy, CENTER_WEIGHTS @ xy), axis=-2)
+        points[..., HIP_VERTICAL, 1] = 0
+        return points
+
 
 class FrontSplitAnalyzer(PoseAnalyzer):
     """Analyzes front split poses"""
@@ -68,40 +115,19 @@ class FrontSplitAnalyzer(PoseAnalyzer):
         """Main analysis method"""
         results = {'pose_type': 'front_split'}
         
-        # Extract key points
-        left_hip = (landmarks[23].x * image_width, landmarks[23].y * image_height)
-        right_hip = (landmarks[24].x * image_width, landmarks[24].y * image_height)
-        hip_center = ((left_hip[0] + right_hip[0]) / 2, (left_hip[1] + right_hip[1]) / 2)
-        
-        left_shoulder = (landmarks[11].x * image_width, landmarks[11].y * image_height)
-        right_shoulder = (landmarks[12].x * image_width, landmarks[12].y * image_height)
-        shoulder_center = ((left_shoulder[0] + right_shoulder[0]) / 2, 
-                          (left_shoulder[1] + right_shoulder[1]) / 2)
-        
-        left_knee = (landmarks[25].x * image_width, landmarks[25].y * image_height)
-        right_knee = (landmarks[26].x * image_width, landmarks[26].y * image_height)
-        
-        left_ankle = (landmarks[27].x * image_width, landmarks[27].y * image_height)
-        right_ankle = (landmarks[28].x * image_width, landmarks[28].y * image_height)
-        
-        # Determine front/back legs
-        if left_knee[1] > right_knee[1]:
-            front_hip, front_knee, front_ankle = left_hip, left_knee, left_ankle
-            back_hip, back_knee, back_ankle = right_hip, right_knee, right_ankle
-        else:
-            front_hip, front_knee, front_ankle = right_hip, right_knee, right_ankle
-            back_hip, back_knee, back_ankle = left_hip, left_knee, left_ankle
+        # Key points and all four angles in one batched call
+        P = landmarks.data
+        K = self.keypoints(P)
+        hip_center = K[HIP_CENTER]
         
-        # Calculations
-        hip_flexor_angle = self.calculate_angle(front_ankle, front_hip, shoulder_center)
-        hip_opening_angle = self.calculate_angle(front_ankle, hip_center, back_ankle)
-        front_knee_angle = self.calculate_angle(front_hip, front_knee, front_ankle)
-        back_knee_angle = self.calculate_angle(back_hip, back_knee, back_ankle)
+        # Determine front/back legs (the lower knee is in front)
+        triples = K[SPLIT_TRIPLES[0 if P[25, 1] > P[26, 1] else 1]]
+        hip_flexor_angle, hip_opening_angle, front_knee_angle, back_knee_angle = \
+            self.calculate_angles(triples[:, 0], triples[:, 1], triples[:, 2]).tolist()
         
-        # Floor distance
-        floor_level = max(left_ankle[1], right_ankle[1], 
-                         landmarks[29].y * image_height, landmarks[30].y * image_height)
-        hip_to_floor_px = floor_level - hip_center[1]
+        # Floor distance (lowest of ankles and heels)
+        floor_level = float(P[27:31, 1].max())
+        hip_to_floor_px = floor_level - float(hip_center[1])
         
         # Auto-calibrate
         if self.calibration_factor is None:
@@ -127,9 +153,8 @@ class FrontSplitAnalyzer(PoseAnalyzer):
         results['back_knee_angle'] = back_knee_angle
         results['hip_to_floor_px'] = hip_to_floor_px
         
-        # Confidence
-        key_landmarks = [23, 24, 25, 26, 27, 28]
-        results['confidence'] = np.mean([landmarks[i].visibility for i in key_landmarks])
+        # Confidence (hips, knees, ankles)
+        results['confidence'] = float(P[23:29, 3].mean())
         
         # Form feedback
         results['feedback'] = []
@@ -144,14 +169,67 @@ class FrontSplitAnalyzer(PoseAnalyzer):
         
         return results
     
+    def analyze_sequence(self, landmarks, image_width, image_height, assumed_height_cm=135,
+                         calibration_factor=None):
+        """
+        Analyze a whole recording at once.
+        landmarks: (T, 33, 4) pixel-space array (LandmarkFrame rows), NaN rows for frames without a pose.
+        Returns columnar (T,) arrays. Calibrated from the recording itself unless
+        calibration_factor (cm per pixel) is given; live analyze() state is not used.
+        """
+        P = np.asarray(landmarks, dtype=np.float32)
+        K = self.keypoints(P)
+        hip_center = K[:, HIP_CENTER]
+        
+        # Per-frame front/back leg choice, then all 4 angles for all frames
+        left_front = (P[:, 25, 1] > P[:, 26, 1])[:, None, None, None]
+        triples = np.where(left_front, K[:, SPLIT_TRIPLES[0]], K[:, SPLIT_TRIPLES[1]])
+        angles = self.calculate_angles(triples[:, :, 0], triples[:, :, 1], triples[:, :, 2])
+        hip_flexor_angle, hip_opening_angle, front_knee_angle, back_knee_angle = angles.T
+        
+        floor_level = P[:, 27:31, 1].max(axis=1)
+        hip_to_floor_px = floor_level - hip_center[:, 1]
+        
+        # Calibration as analyze() would do it: fixed from the first frame with a positive height
+        calibration = np.full(len(P), np.nan)
+        if calibration_factor:
+            calibration[:] = calibration_factor
+        else:
+            person_height_pixels = (P[:, 27, 1] + P[:, 28, 1]) / 2 - P[:, 0, 1]
+            valid = np.flatnonzero(person_height_pixels > 0)
+            if len(valid):
+                calibration[valid[0]:] = assumed_height_cm / person_height_pixels[valid[0]]
+        hip_to_floor_cm = hip_to_floor_px * calibration
+        
+        angle_factor = np.minimum(hip_opening_angle / 180.0, 1.0)
+        distance_factor = np.clip(np.where(np.isnan(calibration),
+                                           1.0 - hip_to_floor_px / (image_height * 0.3),
+                                           1.0 - hip_to_floor_cm / 50.0), 0, 1.0)
+        split_percentage = ((angle_factor * 0.6) + (distance_factor * 0.4)) * 100
+        
+        return {
+            'pose_type': 'front_split',
+            'primary_metric': split_percentage,
+            'hip_opening_angle': hip_opening_angle,
+            'hip_flexor_angle': hip_flexor_angle,
+            'front_knee_angle': front_knee_angle,
+            'back_knee_angle': back_knee_angle,
+            'hip_to_floor_px': hip_to_floor_px,
+            'hip_to_floor_cm': hip_to_floor_cm,
+            'confidence': P[:, 23:29, 3].mean(axis=1),
+            'feedback': {
+                "Straighten front leg": front_knee_angle < 160,
+                "Straighten back leg": back_knee_angle < 160,
+            },
+        }
+    
     def _auto_calibrate(self, landmarks, image_height, assumed_height_cm=135):
         """Auto-calibrate using person's height"""
-        nose_y = landmarks[0].y * image_height
-        left_ankle_y = landmarks[27].y * image_height
-        right_ankle_y = landmarks[28].y * image_height
-        avg_ankle_y = (left_ankle_y + right_ankle_y) / 2
+        P = landmarks.data
+        nose_y = P[0, 1]
+        avg_ankle_y = (P[27, 1] + P[28, 1]) / 2
         
-        person_height_pixels = avg_ankle_y - nose_y
+        person_height_pixels = float(avg_ankle_y - nose_y)
         if person_height_pixels > 0:
             self.calibration_factor = assumed_height_cm / person_height_pixels
             self.reference_height = person_height_pixels
@@ -197,38 +275,20 @@ class ForwardFoldAnalyzer(PoseAnalyzer):
         """Analyze forward fold pose"""
         results = {'pose_type': 'forward_fold'}
         
-        # Key points
-        left_hip = (landmarks[23].x * image_width, landmarks[23].y * image_height)
-        right_hip = (landmarks[24].x * image_width, landmarks[24].y * image_height)
-        hip_center = ((left_hip[0] + right_hip[0]) / 2, (left_hip[1] + right_hip[1]) / 2)
-        
-        left_shoulder = (landmarks[11].x * image_width, landmarks[11].y * image_height)
-        right_shoulder = (landmarks[12].x * image_width, landmarks[12].y * image_height)
-        shoulder_center = ((left_shoulder[0] + right_shoulder[0]) / 2, 
-                          (left_shoulder[1] + right_shoulder[1]) / 2)
-        
-        left_knee = (landmarks[25].x * image_width, landmarks[25].y * image_height)
-        right_knee = (landmarks[26].x * image_width, landmarks[26].y * image_height)
-        knee_center = ((left_knee[0] + right_knee[0]) / 2, (left_knee[1] + right_knee[1]) / 2)
+        # Key points and both angles in one batched call
+        P = landmarks.data
+        K = self.keypoints(P)
+        shoulder_center, hip_center = K[SHOULDER_CENTER], K[HIP_CENTER]
+        knee_center, wrist_center = K[KNEE_CENTER], K[WRIST_CENTER]
         
-        left_ankle = (landmarks[27].x * image_width, landmarks[27].y * image_height)
-        right_ankle = (landmarks[28].x * image_width, landmarks[28].y * image_height)
-        ankle_center = ((left_ankle[0] + right_ankle[0]) / 2, (left_ankle[1] + right_ankle[1]) / 2)
-        
-        # Torso angle (hip to shoulder relative to vertical)
-        vertical_ref = (hip_center[0], 0)  # Point directly above hip
-        torso_angle = self.calculate_angle(vertical_ref, hip_center, shoulder_center)
-        
-        # Hip flexion angle (torso to legs)
-        hip_flexion = self.calculate_angle(shoulder_center, hip_center, knee_center)
+        # Torso angle (hip to shoulder relative to vertical), hip flexion angle (torso to legs)
+        triples = K[FOLD_TRIPLES]
+        torso_angle, hip_flexion = \
+            self.calculate_angles(triples[:, 0], triples[:, 1], triples[:, 2]).tolist()
         
         # Hand to floor distance (if hands visible)
-        left_wrist = (landmarks[15].x * image_width, landmarks[15].y * image_height)
-        right_wrist = (landmarks[16].x * image_width, landmarks[16].y * image_height)
-        wrist_center = ((left_wrist[0] + right_wrist[0]) / 2, (left_wrist[1] + right_wrist[1]) / 2)
-        
-        floor_level = max(left_ankle[1], right_ankle[1])
-        hands_to_floor_px = floor_level - wrist_center[1]
+        floor_level = float(max(P[27, 1], P[28, 1]))
+        hands_to_floor_px = floor_level - float(wrist_center[1])
         
         # Flexibility score (0-100%)
         # Perfect forward fold: torso parallel to legs (hip_flexion near 0°)
@@ -240,9 +300,8 @@ class ForwardFoldAnalyzer(PoseAnalyzer):
         results['flexibility_score'] = flexibility_score
         results['hands_to_floor_px'] = hands_to_floor_px
         
-        # Confidence
-        key_landmarks = [11, 12, 23, 24, 25, 26]
-        results['confidence'] = np.mean([landmarks[i].visibility for i in key_landmarks])
+        # Confidence (shoulders, hips, knees)
+        results['confidence'] = float(P[FOLD_KEY_LANDMARKS, 3].mean())
         
         results['feedback'] = []
         if hip_flexion > 45:
@@ -256,6 +315,36 @@ class ForwardFoldAnalyzer(PoseAnalyzer):
         
         return results
     
+    def analyze_sequence(self, landmarks, image_width, image_height):
+        """
+        Analyze a whole recording at once.
+        landmarks: (T, 33, 4) pixel-space array (LandmarkFrame rows), NaN rows for frames without a pose.
+        Returns columnar (T,) arrays.
+        """
+        P = np.asarray(landmarks, dtype=np.float32)
+        K = self.keypoints(P)
+        
+        triples = K[:, FOLD_TRIPLES]
+        torso_angle, hip_flexion = self.calculate_angles(
+            triples[:, :, 0], triples[:, :, 1], triples[:, :, 2]).T
+        
+        floor_level = P[:, 27:29, 1].max(axis=1)
+        hands_to_floor_px = floor_level - K[:, WRIST_CENTER, 1]
+        
+        return {
+            'pose_type': 'forward_fold',
+            'primary_metric': hip_flexion,
+            'torso_angle': torso_angle,
+            'hip_flexion': hip_flexion,
+            'flexibility_score': np.maximum(0, 100 - (hip_flexion / 180.0 * 100)),
+            'hands_to_floor_px': hands_to_floor_px,
+            'confidence': P[:, FOLD_KEY_LANDMARKS, 3].mean(axis=1),
+            'feedback': {
+                "Bend deeper from hips": hip_flexion > 45,
+                "Reach closer to floor": hands_to_floor_px > 50,
+            },
+        }
+    
     def _draw_annotations(self, frame, shoulder, hip, knee, wrist, floor, results):
         """Draw measurements"""
         # Spine line
@@ -284,6 +373,9 @@ class MultiPoseAnalyzer:
         analyzer = MultiPoseAnalyzer()
         analyzer.set_pose('front_split')
         results = analyzer.analyze(landmarks, width, height, frame)
+
+    landmarks may be a LandmarkFrame or a MediaPipe landmark list
+    (the list is packed into a reused LandmarkFrame first).
     """
     
     def __init__(self):
@@ -292,6 +384,7 @@ class MultiPoseAnalyzer:
             'forward_fold': ForwardFoldAnalyzer(),
         }
         self.current_pose = 'front_split'
+        self.landmark_frame = LandmarkFrame()
     
     def set_pose(self, pose_name):
         """Change the active pose type"""
@@ -314,10 +407,23 @@ class MultiPoseAnalyzer:
     
     def analyze(self, landmarks, image_width, image_height, draw_frame=None):
         """Analyze current pose"""
+        if not isinstance(landmarks, LandmarkFrame):
+            self.landmark_frame.fill(landmarks, image_width, image_height)
+            landmarks = self.landmark_frame
         return self.analyzers[self.current_pose].analyze(
             landmarks, image_width, image_height, draw_frame
         )
     
+    def analyze_sequence(self, landmarks, image_width, image_height, pose_name=None, **options):
+        """
+        Analyze a whole (T, 33, 4) pixel-space landmark recording with the current
+        (or given) pose analyzer. options go to its analyze_sequence (e.g.
+        assumed_height_cm for the front split). Returns a dict of (T,) metric
+        arrays plus 'feedback': {message: (T,) bool array}.
+        """
+        analyzer = self.analyzers[pose_name or self.current_pose]
+        return analyzer.analyze_sequence(landmarks, image_width, image_height, **options)
+    
     def calculate_angle(self, a, b, c):
         """Convenience method for simple angle calculations"""
         return PoseAnalyzer.calculate_angle(a, b, c)
\ No newline at end of file
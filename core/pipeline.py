@@ -0,0 +1,186 @@
+"""
+Pipelined frame processing: capture and each stage run on their own thread,
+connected by small bounded queues.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+_END = object()  # end-of-stream marker passed down the stages
+
+
+def same_frame(a, b, noise=12, max_changed=0.002, step=8):
+    """
+    True when b shows the same scene as a: on a 1/step subsample, at most
+    max_changed of the pixels differ by more than `noise` grey levels, so
+    sensor noise passes but a moving hand does not
+    """
+    if a.shape != b.shape:
+        return False
+    diff = np.abs(a[::step, ::step].astype(np.int16) - b[::step, ::step])
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    return np.count_nonzero(diff > noise) <= max_changed * diff.size
+
+
+class Pipeline:
+    """
+    Usage:
+        pipeline = Pipeline(source, [infer, analyze, render])
+        pipeline.start()
+        item = pipeline.latest()  # newest finished item, or None if nothing new
+
+    Stages take an item dict ({'index', 'frame', 'timestamp'}) and return it, or None to drop it.
+    drop_frames: discard the oldest queued item when a stage falls behind (live camera).
+    skip_duplicates: pass over frames that repeat the last processed one.
+    stats: LatencyStats timing capture, items get 'captured_at' for end-to-end latency.
+    """
+
+    def __init__(self, source, stages, maxsize=2, drop_frames=True, skip_duplicates=False,
+                 stats=None):
+        self.source = source
+        self.stages = list(stages)
+        self.maxsize = maxsize
+        self.drop_frames = drop_frames
+        self.skip_duplicates = skip_duplicates
+        self.stats = stats
+
+        self.queues = [queue.Queue(maxsize=maxsize) for _ in self.stages]
+        self.threads = []
+        self.dropped = 0       # frames discarded between stages
+        self.duplicates = 0    # unchanged frames that skipped processing
+        self.finished = False  # source exhausted and all stages drained
+        self.error = None      # first exception raised by a stage
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._capture_done = True      # capture worker not inside source.read()
+        self._release_on_exit = False  # stop() left releasing the source to the capture worker
+
+    def start(self):
+        self._capture_done = False
+        self.threads = [threading.Thread(target=self._capture_worker, daemon=True)]
+        for i, stage in enumerate(self.stages):
+            out_q = self.queues[i + 1] if i + 1 < len(self.stages) else None
+            t = threading.Thread(target=self._stage_worker,
+                                 args=(stage, self.queues[i], out_q), daemon=True)
+            self.threads.append(t)
+        for t in self.threads:
+            t.start()
+
+    def stop(self, release_source=False):
+        """Stop every worker; with release_source also release the source once nothing reads it"""
+        self._stop.set()
+        for t in self.threads:
+            t.join(timeout=2.0)
+        self.threads = []
+        if release_source:
+            with self._lock:
+                if not self._capture_done:
+                    # Still blocked in read(): the capture worker releases it on the way out
+                    self._release_on_exit = True
+                    return
+            self.source.release()
+
+    def latest(self):
+        """Return the newest finished item once, or None"""
+        with self._lock:
+            item, self._latest = self._latest, None
+        return item
+
+    def _fail(self, error):
+        # Keep the first error and shut every worker down
+        if self.error is None:
+            self.error = error
+        self._stop.set()
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self.drop_frames and item is not _END:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        continue
+                    with self._lock:
+                        self.dropped += 1
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _END
+
+    def _capture_worker(self):
+        try:
+            self._capture()
+        finally:
+            with self._lock:
+                self._capture_done = True
+                release = self._release_on_exit
+            if release:
+                self.source.release()
+
+    def _capture(self):
+        index = 0
+        previous = None
+        previous_timestamp = None
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                ret, frame = self.source.read()
+            except Exception as e:
+                self._fail(e)
+                break
+            if not ret or frame is None:
+                break
+            if self.stats is not None:
+                self.stats.record('capture', time.perf_counter() - start)
+            timestamp = getattr(self.source, 'last_timestamp', None)
+            if self.skip_duplicates:
+                if previous is not None and (
+                        (timestamp is not None and timestamp == previous_timestamp)
+                        or same_frame(previous, frame)):
+                    self.duplicates += 1
+                    continue
+                previous, previous_timestamp = frame, timestamp
+            item = {'index': index, 'frame': frame, 'timestamp': timestamp}
+            if self.stats is not None:
+                item['captured_at'] = start
+            self._put(self.queues[0], item)
+            index += 1
+            if getattr(self.source, 'is_static', False):
+                break  # one frame is all a still image has
+        self._put(self.queues[0], _END)
+
+    def _stage_worker(self, stage, in_q, out_q):
+        while True:
+            item = self._get(in_q)
+            if item is _END:
+                break
+            try:
+                item = stage(item)
+            except Exception as e:
+                self._fail(e)
+                break
+            if item is None:
+                continue
+            if out_q is None:
+                with self._lock:
+                    self._latest = item
+            else:
+                self._put(out_q, item)
+
+        if out_q is None:
+            self.finished = True
+        else:
+            self._put(out_q, _END)
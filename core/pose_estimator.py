@@ -4,7 +4,70 @@ Handles MediaPipe pose detection & webcam feed.
 
 
 import cv2
+import numpy as np
 import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+from core.landmarks import NUM_LANDMARKS
+from core.latency import timed
+
+
+def landmarks_to_array(pose_landmarks, out=None):
+    """Pack MediaPipe pose_landmarks into a (33, 4) float32 array of x, y, z, visibility"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+    for i, lm in enumerate(pose_landmarks.landmark):
+        out[i] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+
+class ArrayResults:
+    """
+    Results shaped like MediaPipe's, backed by a (33, 4) array (or None).
+    The landmark protobuf is only built if something asks for pose_landmarks.
+    predicted: landmarks were estimated between keyframes, not detected.
+    """
+    __slots__ = ('landmark_array', '_pose_landmarks', 'predicted')
+
+    def __init__(self, arr):
+        self.landmark_array = arr
+        self._pose_landmarks = None
+        self.predicted = False
+
+    @property
+    def pose_landmarks(self):
+        if self.landmark_array is None:
+            return None
+        if self._pose_landmarks is None:
+            self._pose_landmarks = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z, v in self.landmark_array.tolist():
+                self._pose_landmarks.landmark.add(x=x, y=y, z=z, visibility=v)
+        return self._pose_landmarks
+
+
+def array_to_results(arr):
+    """Results object for a (33, 4) normalized landmark array (None = no pose)"""
+    return ArrayResults(arr)
+
+
+# Same look as mp.solutions.drawing_utils.draw_landmarks with its default styles
+POSE_CONNECTIONS = tuple(mp.solutions.pose.POSE_CONNECTIONS)
+
+
+def draw_skeleton(image, arr, min_visibility=0.5):
+    """Draw a (33, 4) normalized landmark array onto a BGR image in place"""
+    h, w = image.shape[:2]
+    xy = np.nan_to_num(arr[:, :2], nan=-1.0)
+    visible = (arr[:, 3] >= min_visibility) & (xy >= 0).all(axis=1) & (xy <= 1).all(axis=1)
+    px = np.minimum(np.floor(xy * (w, h)), (w - 1, h - 1)).astype(int).tolist()
+    points = {i: tuple(px[i]) for i in np.flatnonzero(visible).tolist()}
+    for a, b in POSE_CONNECTIONS:
+        if a in points and b in points:
+            cv2.line(image, points[a], points[b], (224, 224, 224), 2)
+    for p in points.values():
+        cv2.circle(image, p, 3, (224, 224, 224), 2)
+        cv2.circle(image, p, 2, (0, 0, 255), 2)
+
 
 class PoseEstimator:
 
@@ -14,30 +77,168 @@ class PoseEstimator:
     # For more accurate model or tighter detections use higher confidence scores on these parameters
     # Needs to be a trade off. Higher scores = less detections especially for lower quality cameras and less maintanence of state
     # Test to find the best score
-    def __init__(self, min_detection_conf=0.5, min_tracking_conf=0.5):
+    #
+    # roi_tracking runs MediaPipe on a padded box around the person (roi_padding is a
+    # fraction of the box size) with its own graph, and on the full frame when tracking
+    # is lost. The box only moves when the person nears its edge, and the crop graph is
+    # reset then, so MediaPipe's own tracking always sees a steady view.
+    # inference_size caps the longest side of the image handed to MediaPipe.
+    # static_image_mode detects on every frame without tracking (unrelated images).
+    # model_complexity (0, 1, 2) and input_scale trade accuracy for speed, see set_quality().
+    # latency_stats (a core.latency.LatencyStats) times colour conversion, inference
+    # and skeleton drawing per frame.
+    def __init__(self, min_detection_conf=0.5, min_tracking_conf=0.5,
+                 roi_tracking=False, roi_padding=0.25, inference_size=None,
+                 model_complexity=1, input_scale=1.0, static_image_mode=False,
+                 latency_stats=None):
         # imports pose estimation model from mediapipe
         self.mp_pose = mp.solutions.pose 
+        self.min_detection_conf = min_detection_conf
+        self.min_tracking_conf = min_tracking_conf
+        self.model_complexity = model_complexity
+        self.input_scale = input_scale
+        self.static_image_mode = static_image_mode
         # Setup mediapipe instance as variable pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=min_detection_conf,
-            min_tracking_confidence=min_tracking_conf
-        ) 
+        self.pose = self._create_pose()
         # Drawing utitilities for visualising poses
         self.mp_drawing = mp.solutions.drawing_utils 
 
-    def process_frame(self, frame):
-        """Process frame with MediaPipe and return results + annotated image"""
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.inference_size = inference_size
+        self.roi = None  # (x0, y0, x1, y1) in pixels, None = use full frame
+        self.roi_pose = self._create_pose() if roi_tracking else None
+        self.latency_stats = latency_stats
+
+    def _create_pose(self):
+        return self.mp_pose.Pose(
+            static_image_mode=self.static_image_mode,
+            model_complexity=self.model_complexity,
+            min_detection_confidence=self.min_detection_conf,
+            min_tracking_confidence=self.min_tracking_conf
+        )
+
+    def settings(self):
+        """Everything that affects the detected landmarks (used as a cache key)"""
+        return {
+            'min_detection_conf': self.min_detection_conf,
+            'min_tracking_conf': self.min_tracking_conf,
+            'model_complexity': self.model_complexity,
+            'input_scale': self.input_scale,
+            'roi_tracking': self.roi_tracking,
+            'roi_padding': self.roi_padding,
+            'inference_size': self.inference_size,
+            'static_image_mode': self.static_image_mode,
+        }
+
+    def set_quality(self, model_complexity, input_scale):
+        """Switch model complexity and input scale (reloads the model if complexity changes)"""
+        self.input_scale = input_scale
+        if model_complexity != self.model_complexity:
+            self.model_complexity = model_complexity
+            self.pose.close()
+            self.pose = self._create_pose()
+            if self.roi_pose is not None:
+                self.roi_pose.close()
+                self.roi_pose = self._create_pose()
+            self.roi = None
+
+    def reset(self):
+        """Forget tracking state before starting on an unrelated video"""
+        self.pose.reset()
+        if self.roi_pose is not None:
+            self.roi_pose.reset()
+        self.roi = None
+
+    def _infer(self, image_bgr, pose=None):
+        """Optionally downscale, convert and run MediaPipe"""
+        h, w = image_bgr.shape[:2]
+        scale = self.input_scale
+        if self.inference_size and max(h, w) * scale > self.inference_size:
+            scale = self.inference_size / max(h, w)
+        if scale < 1.0:
+            image_bgr = cv2.resize(image_bgr, (max(1, int(w * scale)), max(1, int(h * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        with timed(self.latency_stats, 'color'):
+            image = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
         image.flags.writeable = False
-        results = self.pose.process(image)
+        with timed(self.latency_stats, 'inference'):
+            return (self.pose if pose is None else pose).process(image)
+
+    def _update_roi(self, results, width, height, min_visible=8):
+        """Keep, move or drop the box around the visible landmarks"""
+        pts = []
+        if results.pose_landmarks:
+            pts = [(lm.x, lm.y) for lm in results.pose_landmarks.landmark if lm.visibility > 0.5]
+        if len(pts) < min_visible:
+            self.roi = None
+            return
+        xs, ys = zip(*pts)
+        x0, x1 = min(xs) * width, max(xs) * width
+        y0, y1 = min(ys) * height, max(ys) * height
+        pad = self.roi_padding * max(x1 - x0, y1 - y0)
+
+        if self.roi is not None:
+            # Keep the box while the person stays clear of its edges
+            margin = 0.5 * pad
+            rx0, ry0, rx1, ry1 = self.roi
+            if (x0 - margin >= rx0 or rx0 == 0) and (y0 - margin >= ry0 or ry0 == 0) and \
+                    (x1 + margin <= rx1 or rx1 == width) and (y1 + margin <= ry1 or ry1 == height):
+                return
+
+        x0, y0 = max(0, int(x0 - pad)), max(0, int(y0 - pad))
+        x1, y1 = min(width, int(x1 + pad)), min(height, int(y1 + pad))
+        self.roi = (x0, y0, x1, y1) if x1 - x0 > 16 and y1 - y0 > 16 else None
+        # A new view: the crop graph must not track across it
+        self.roi_pose.reset()
 
-        # Convert back for OpenCV rendering
-        image.flags.writeable = True
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    def detect(self, frame):
+        """Run MediaPipe on a BGR frame and return the raw results"""
+        if not self.roi_tracking:
+            return self._infer(frame)
 
+        h, w = frame.shape[:2]
+        results = None
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            results = self._infer(frame[y0:y1, x0:x1], self.roi_pose)
+            if results.pose_landmarks:
+                # Map crop-normalized coordinates back to the full frame
+                cw, ch = x1 - x0, y1 - y0
+                for lm in results.pose_landmarks.landmark:
+                    lm.x = (lm.x * cw + x0) / w
+                    lm.y = (lm.y * ch + y0) / h
+                    lm.z = lm.z * cw / w
+            else:
+                results = None
+                self.roi = None  # lost in the crop: pick a fresh box from the full frame
+
+        if results is None:
+            # Lost the person (or first frame): search the whole frame
+            results = self._infer(frame)
+
+        self._update_roi(results, w, h)
+        return results
+
+    def draw(self, image, results):
+        """Draw the detected skeleton onto a BGR image in place"""
         if results.pose_landmarks:
             self.mp_drawing.draw_landmarks(
                 image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS
             )
 
-        return image, results
\ No newline at end of file
+    def process_frame(self, frame, timestamp=None):
+        """Process frame with MediaPipe and return results + annotated image"""
+        results = self.detect(frame)
+
+        # Copy for OpenCV rendering
+        with timed(self.latency_stats, 'skeleton'):
+            image = frame.copy()
+            self.draw(image, results)
+
+        return image, results
+
+    def close(self):
+        self.pose.close()
+        if self.roi_pose is not None:
+            self.roi_pose.close()
\ No newline at end of file
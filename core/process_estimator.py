@@ -0,0 +1,128 @@
+"""
+Out-of-process MediaPipe backend.
+Frames go to a worker process through shared memory, so image arrays are never
+pickled, and landmarks come back as compact (33, 4) arrays.
+Keeps the PoseEstimator.process_frame contract so GUIApp can use either backend.
+"""
+
+import inspect
+import multiprocessing as mproc
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.pose_estimator import PoseEstimator, landmarks_to_array, array_to_results, draw_skeleton
+
+
+def _pose_worker(conn, estimator_kwargs):
+    """Worker process: run MediaPipe on the shared frame buffer until told to stop"""
+    estimator = PoseEstimator(**estimator_kwargs)
+    shm = None
+    shape = None
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            if message[0] == 'attach':
+                # The parent outgrew the old buffer and made a bigger one
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=message[1])
+                continue
+            if message[1] != shape:
+                shape = message[1]
+                estimator.reset()  # a different feed, don't track across it
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            results = estimator.detect(frame)
+            del frame  # shm can't be closed while a view exists
+            if results.pose_landmarks:
+                conn.send(landmarks_to_array(results.pose_landmarks))
+            else:
+                conn.send(None)
+    finally:
+        estimator.close()
+        if shm is not None:
+            shm.close()
+
+
+class ProcessPoseEstimator:
+    """
+    Drop-in replacement for PoseEstimator that runs inference in a worker process.
+    The worker is started on the first frame and the shared buffer only grows,
+    so a change of frame size costs neither a respawn nor a model reload.
+    Results carry the landmark array; the skeleton is drawn straight from it.
+    Call close() when done to stop the worker and free the shared memory.
+    """
+
+    def __init__(self, **estimator_kwargs):
+        self.estimator_kwargs = estimator_kwargs
+        self.shm = None
+        self.conn = None
+        self.proc = None
+
+    def settings(self):
+        """Same settings dict as the PoseEstimator running in the worker"""
+        params = inspect.signature(PoseEstimator.__init__).parameters
+        settings = {name: p.default for name, p in params.items()
+                    if name not in ('self', 'latency_stats')}
+        settings.update(self.estimator_kwargs)
+        return settings
+
+    def _start(self):
+        # spawn: never fork a process that owns Tk and worker threads
+        ctx = mproc.get_context('spawn')
+        self.conn, child_conn = ctx.Pipe()
+        self.proc = ctx.Process(target=_pose_worker, args=(child_conn, self.estimator_kwargs),
+                                daemon=True)
+        self.proc.start()
+        child_conn.close()
+
+    def _buffer(self, nbytes):
+        """Shared buffer of at least nbytes, attached in the worker"""
+        if self.proc is None:
+            self._start()
+        if self.shm is None or self.shm.size < nbytes:
+            old = self.shm
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.conn.send(('attach', self.shm.name))
+            if old is not None:
+                old.close()
+                old.unlink()  # the worker's mapping stays valid until it switches
+        return self.shm.buf
+
+    def process_frame(self, frame, timestamp=None):
+        """Process frame in the worker and return annotated image + results"""
+        shared = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._buffer(frame.nbytes))
+        np.copyto(shared, frame)
+        del shared
+        self.conn.send(('frame', frame.shape))
+
+        # Prepare the output image while the worker runs inference
+        image = frame.copy()
+
+        try:
+            landmarks = self.conn.recv()
+        except EOFError:
+            raise RuntimeError("Pose worker process exited unexpectedly")
+
+        if landmarks is not None:
+            draw_skeleton(image, landmarks)
+        return image, array_to_results(landmarks)
+
+    def close(self):
+        if self.proc is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.proc.join(timeout=2.0)
+            if self.proc.is_alive():
+                self.proc.terminate()
+            self.conn.close()
+            self.proc = None
+            self.conn = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,133 @@
+"""
+Adaptive inference quality.
+Measures rolling per-frame inference latency and steps model complexity and
+input scale up or down to hold a frame-time budget.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+# (model_complexity, input_scale), cheapest first. MediaPipe downloads the
+# complexity 2 (heavy) model on first use, so it is only tried if passed in levels.
+QUALITY_LEVELS = [
+    (0, 0.5),
+    (0, 0.75),
+    (0, 1.0),
+    (1, 0.75),
+    (1, 1.0),
+]
+
+
+class AdaptiveQualityController:
+    """
+    Wraps a PoseEstimator and keeps its process_frame contract.
+    Hysteresis: step down when the rolling mean latency is above
+    frame_budget * downgrade_margin, step up only when it is below
+    frame_budget * upgrade_margin, and wait `cooldown` frames after every change.
+    An upgrade that has to be undone doubles the wait before the next upgrade.
+    """
+
+    def __init__(self, estimator, frame_budget=1/30, window=30, cooldown=60,
+                 upgrade_margin=0.6, downgrade_margin=1.0, auto_benchmark=True,
+                 levels=QUALITY_LEVELS):
+        self.estimator = estimator
+        self.frame_budget = frame_budget
+        self.cooldown = cooldown
+        self.upgrade_margin = upgrade_margin
+        self.downgrade_margin = downgrade_margin
+        self.auto_benchmark = auto_benchmark
+        self.levels = list(levels)
+
+        self.latencies = deque(maxlen=window)
+        self.level = len(self.levels) - 1
+        self.frames_since_change = 0
+        self.upgrade_backoff = 1
+        self.last_change = None  # 'up' or 'down'
+        self.benchmarked = False
+
+        self._apply(self._closest_level())
+
+    def _closest_level(self):
+        # Start from the level matching the estimator's current settings if there is one
+        current = (self.estimator.model_complexity, self.estimator.input_scale)
+        if current in self.levels:
+            return self.levels.index(current)
+        return len(self.levels) - 1
+
+    def _apply(self, level):
+        self.level = level
+        complexity, scale = self.levels[level]
+        self.estimator.set_quality(complexity, scale)
+        self.latencies.clear()
+        self.frames_since_change = 0
+
+    def benchmark(self, frame, runs=5, warmup=1):
+        """Pick the highest level whose median latency on `frame` fits the budget"""
+        target = self.frame_budget * (self.upgrade_margin + self.downgrade_margin) / 2
+        chosen = 0
+        for level in range(len(self.levels) - 1, -1, -1):
+            self._apply(level)
+            for _ in range(warmup):
+                self.estimator.detect(frame)
+            times = []
+            for _ in range(runs):
+                # Without a reset every run after the first only tracks the same
+                # frame, which is far cheaper than a real frame
+                self.estimator.reset()
+                start = time.perf_counter()
+                self.estimator.detect(frame)
+                times.append(time.perf_counter() - start)
+            if np.median(times) <= target:
+                chosen = level
+                break
+        self._apply(chosen)
+        self.estimator.reset()
+        self.benchmarked = True
+        return self.levels[chosen]
+
+    def _adapt(self):
+        if len(self.latencies) < self.latencies.maxlen:
+            return
+        mean = sum(self.latencies) / len(self.latencies)
+
+        if mean > self.frame_budget * self.downgrade_margin and self.level > 0:
+            if self.last_change == 'up':
+                # The last upgrade didn't fit, try again later
+                self.upgrade_backoff *= 2
+            self.last_change = 'down'
+            self._apply(self.level - 1)
+        elif (mean < self.frame_budget * self.upgrade_margin
+              and self.level < len(self.levels) - 1
+              and self.frames_since_change >= self.cooldown * self.upgrade_backoff):
+            self.last_change = 'up'
+            self._apply(self.level + 1)
+
+    def process_frame(self, frame, timestamp=None):
+        if self.auto_benchmark and not self.benchmarked:
+            self.benchmark(frame)
+
+        start = time.perf_counter()
+        output = self.estimator.process_frame(frame, timestamp)
+        self.latencies.append(time.perf_counter() - start)
+        self.frames_since_change += 1
+
+        if self.frames_since_change >= self.cooldown:
+            self._adapt()
+        return output
+
+    def settings(self):
+        """The estimator's settings, with the quality it adapts replaced by the budget and levels"""
+        settings = dict(self.estimator.settings(), frame_budget=self.frame_budget,
+                        levels=self.levels)
+        settings.pop('model_complexity', None)
+        settings.pop('input_scale', None)
+        return settings
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def close(self):
+        self.estimator.close()
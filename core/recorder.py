@@ -0,0 +1,132 @@
+"""
+Recorded sessions for deterministic replay: raw (T, H, W, 3) uint8 .npy frames
+plus a .json sidecar with timestamps and fps, replayed by MmapFrameSource.
+"""
+
+import json
+import os
+import struct
+import time
+
+import cv2
+import numpy as np
+
+from core.sources import FrameSource, recording_paths
+
+# Fixed .npy header size, so the header can be rewritten in place once the frame count is known
+HEADER_SIZE = 128
+
+
+def npy_header(dtype, shape):
+    """Version 1.0 .npy header padded to HEADER_SIZE bytes"""
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                   'fortran_order': False, 'shape': tuple(shape)})
+    header = header.ljust(HEADER_SIZE - 11) + '\n'
+    return (np.lib.format.MAGIC_PREFIX + b'\x01\x00' + struct.pack('<H', len(header))
+            + header.encode('latin1'))
+
+
+class FrameRecorder:
+    """
+    Usage:
+        recorder = FrameRecorder("data/sessions/monday", scale=0.5)
+        recorder.write(frame, timestamp)
+        recorder.close(fps=30)
+
+    scale: resize factor applied before writing.
+    Nothing appears under the final name until close().
+    """
+
+    def __init__(self, path, scale=1.0, source=None):
+        self.npy_path, self.json_path = recording_paths(path)
+        self.scale = scale
+        self.source = source
+        self.timestamps = []
+        self.shape = None
+        self._file = None
+        self._t0 = None
+
+    def write(self, frame, timestamp=None):
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        if self._file is None:
+            self.shape = frame.shape
+            directory = os.path.dirname(self.npy_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.npy_path + ".tmp", 'wb')
+            self._file.write(npy_header(np.uint8, (0,) + self.shape))
+        elif frame.shape != self.shape:
+            raise ValueError(f"frame size changed from {self.shape} to {frame.shape}")
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+        if self._t0 is None:
+            self._t0 = timestamp
+        self.timestamps.append(timestamp - self._t0)
+        self._file.write(memoryview(np.ascontiguousarray(frame, dtype=np.uint8)))
+
+    @property
+    def frames(self):
+        return len(self.timestamps)
+
+    def close(self, fps=None):
+        """Finish the recording; fps defaults to the one implied by the timestamps"""
+        if self._file is None:
+            return
+        self._file.seek(0)
+        self._file.write(npy_header(np.uint8, (self.frames,) + self.shape))
+        self._file.close()
+        self._file = None
+
+        if fps is None and self.frames > 1:
+            step = np.median(np.diff(self.timestamps))
+            fps = 1.0 / step if step > 0 else None
+        h, w = self.shape[:2]
+        meta = {
+            'source': self.source,
+            'frames': self.frames,
+            'width': w,
+            'height': h,
+            'scale': self.scale,
+            'fps': fps,
+            'timestamps': self.timestamps,
+        }
+        with open(self.json_path + ".tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(self.npy_path + ".tmp", self.npy_path)
+        os.replace(self.json_path + ".tmp", self.json_path)
+
+
+class RecordingSource(FrameSource):
+    """Passes another source's frames through unchanged while recording them"""
+
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+        self.is_static = source.is_static
+        self.is_live = source.is_live
+    def read(self):
+        ret, frame = self.source.read()
+        self.last_timestamp = self.source.last_timestamp
+        if ret:
+            self.recorder.write(frame, self.last_timestamp)
+        return ret, frame
+    def release(self):
+        self.source.release()
+        self.recorder.close(fps=getattr(self.source, 'fps', None))
+
+
+def record_source(source, path, scale=1.0, max_frames=None, name=None):
+    """Record a whole source (e.g. to convert a video once for fast replays). Returns frames written."""
+    recorder = FrameRecorder(path, scale, source=name)
+    try:
+        while max_frames is None or recorder.frames < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            recorder.write(frame, source.last_timestamp)
+    finally:
+        recorder.close(fps=getattr(source, 'fps', None))
+    return recorder.frames
@@ -0,0 +1,212 @@
+"""
+Parallel batch processing of many recordings in a process pool.
+Each worker loads the model once and reuses it for every file; failures are
+reported per file (or per chunk, see run_chunked) and the batch carries on.
+"""
+
+import csv
+import multiprocessing as mproc
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from core.batch import (open_file, process_file, process_range, analyze_landmarks,
+                        write_merged_metrics_csv)
+from core.landmark_cache import LandmarkCache
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.pose_estimator import PoseEstimator
+
+# Per-process state, filled in by _init_worker
+_worker = {}
+
+
+def _init_worker(pose, smooth, cache_dir, estimator_kwargs):
+    # Parallelism comes from the processes; don't let OpenCV oversubscribe the cores
+    cv2.setNumThreads(1)
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(pose)
+    _worker['estimator'] = PoseEstimator(**estimator_kwargs)
+    _worker['analyzer'] = analyzer
+    _worker['smooth'] = smooth
+    _worker['cache'] = LandmarkCache(cache_dir) if cache_dir else None
+
+
+def _file_failed(job, error):
+    index, path = job
+    return {'frames': 0, 'elapsed': 0.0, 'fps': 0.0, 'best': None, 'metrics': None,
+            'error': error, 'index': index, 'path': path, 'worker': None}
+
+
+def _chunk_failed(job, error):
+    index, chunk, path = job[:3]
+    return {'frames': 0, 'elapsed': 0.0, 'landmarks': None, 'timestamps': [], 'size': None,
+            'error': error, 'index': index, 'chunk': chunk, 'path': path}
+
+
+def _process_file(job):
+    """Worker: analyze one video. Never raises, errors are returned in the result."""
+    index, path = job
+    estimator = _worker['estimator']
+    try:
+        estimator.reset()  # the previous video's tracking state means nothing here
+        result = process_file(path, estimator, _worker['analyzer'], _worker['cache'],
+                              smooth=_worker['smooth'])
+    except Exception:
+        return dict(_file_failed(job, traceback.format_exc()), worker=os.getpid())
+    del result['landmarks']  # not needed by the parent, keep the pickle small
+    result.update(error=None, index=index, path=path, worker=os.getpid())
+    return result
+
+
+def _process_chunk(job):
+    """Worker: landmarks for one frame range of a video (see process_range). Never raises."""
+    index, chunk, path, start, stop, warmup = job
+    try:
+        result = process_range(path, _worker['estimator'], start, stop, warmup)
+    except Exception:
+        return _chunk_failed(job, traceback.format_exc())
+    result.update(error=None, index=index, chunk=chunk, path=path)
+    return result
+
+
+class BatchScheduler:
+    """
+    Usage:
+        scheduler = BatchScheduler(workers=8, pose='forward_fold')
+        results = scheduler.run(paths, progress=print_progress)
+
+    progress(done, total, result) is called as each file finishes. run() writes merged
+    metrics and summary CSVs to output_dir and returns the results in input order.
+    """
+
+    def __init__(self, workers=None, pose='front_split', smooth=True,
+                 cache_dir="data/landmark_cache", **estimator_kwargs):
+        self.workers = workers or os.cpu_count() or 1
+        self.pose = pose
+        self.smooth = smooth
+        self.cache_dir = cache_dir
+        self.estimator_kwargs = estimator_kwargs
+
+        self.elapsed = 0.0
+        self.frames = 0
+
+    def _map(self, work, jobs, cache_dir, failed):
+        """
+        Yield work(job) for every job as it completes; jobs lost to a dead worker
+        (a broken pool) yield failed(job, error) instead of hanging
+        """
+        ctx = mproc.get_context('spawn')
+        with ProcessPoolExecutor(max(1, min(self.workers, len(jobs))), mp_context=ctx,
+                                 initializer=_init_worker,
+                                 initargs=(self.pose, self.smooth, cache_dir,
+                                           self.estimator_kwargs)) as pool:
+            # One job per task: videos are long, and a short one must not wait behind a batch
+            futures = {pool.submit(work, job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    yield failed(futures[future], traceback.format_exc())
+
+    def run(self, paths, output_dir="data", progress=None):
+        jobs = list(enumerate(paths))
+        results = []
+        start = time.perf_counter()
+        for result in self._map(_process_file, jobs, self.cache_dir, _file_failed):
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(jobs), result)
+        self.elapsed = time.perf_counter() - start
+        self.frames = sum(r['frames'] for r in results)
+
+        results.sort(key=lambda r: r['index'])
+        self.write_results(results, output_dir)
+        return results
+
+    def run_chunked(self, paths, output_dir="data", progress=None,
+                    chunk_frames=None, overlap=30):
+        """
+        Like run(), but each video is split into frame ranges (chunk_frames, default an
+        even split) processed in parallel, each decoded from `overlap` frames earlier.
+        """
+        jobs = []
+        for index, path in enumerate(paths):
+            try:
+                source = open_file(path)
+            except (IOError, ValueError):
+                total = 0  # the worker reports why
+            else:
+                total = source.frame_count
+                source.release()
+            size = (chunk_frames or -(-total // self.workers)) if total > 0 else 0
+            bounds = list(range(0, total, size)) if size else [0]
+            for chunk, start in enumerate(bounds):
+                # The frame count can be approximate: the last range reads to the end
+                stop = bounds[chunk + 1] if chunk + 1 < len(bounds) else None
+                jobs.append((index, chunk, path, start, stop, overlap))
+
+        chunks = {index: [] for index in range(len(paths))}
+        start = time.perf_counter()
+        done = 0
+        for result in self._map(_process_chunk, jobs, None, _chunk_failed):
+            chunks[result['index']].append(result)
+            done += 1
+            if progress is not None:
+                progress(done, len(jobs), result)
+        self.elapsed = time.perf_counter() - start
+
+        analyzer = MultiPoseAnalyzer()
+        analyzer.set_pose(self.pose)
+        results = [self._stitch(index, path, chunks[index], analyzer)
+                   for index, path in enumerate(paths)]
+        self.frames = sum(r['frames'] for r in results)
+        self.write_results(results, output_dir)
+        return results
+
+    def _stitch(self, index, path, chunks, analyzer):
+        """Concatenate one video's chunks in frame order and analyze the whole recording"""
+        chunks.sort(key=lambda r: r['chunk'])
+        errors = [r['error'] for r in chunks if r['error']]
+        result = {'index': index, 'path': path, 'metrics': None, 'best': None,
+                  'error': errors[0] if errors else None,
+                  # wall time of the slowest chunk
+                  'elapsed': max(r['elapsed'] for r in chunks)}
+        if errors:
+            result.update(frames=0, fps=0.0)
+            return result
+        parts = [r for r in chunks if r['frames']]
+        result['frames'] = sum(r['frames'] for r in parts)
+        result['fps'] = result['frames'] / result['elapsed'] if result['elapsed'] > 0 else 0.0
+        if not parts:
+            return result
+        result['landmarks'] = np.concatenate([r['landmarks'] for r in parts])
+        result['timestamps'] = [t for r in parts for t in r['timestamps']]
+        result['size'] = parts[0]['size']
+        return analyze_landmarks(result, analyzer, parts[0]['source_fps'], self.smooth)
+
+    @property
+    def fps(self):
+        """Overall throughput of the last run (all workers together)"""
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def write_results(self, results, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(output_dir, f"batch_{stamp}_{self.pose}")
+
+        write_merged_metrics_csv(base + "_metrics.csv", results)
+        with open(base + "_summary.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(['source', 'frames', 'seconds', 'fps', 'best', 'error'])
+            for r in results:
+                error = r['error'].strip().splitlines()[-1] if r['error'] else ''
+                writer.writerow([r['path'], r['frames'], f"{r['elapsed']:.2f}",
+                                 f"{r['fps']:.1f}",
+                                 '' if r['best'] is None else f"{r['best']:.2f}", error])
+        return base
@@ -1,29 +1,160 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
 import cv2
+import numpy as np
 
 class FrameSource:
+    # True when every read() returns the same image, so one pass is enough
+    is_static = False
+    # Capture time (seconds) of the frame returned by the last read(), None if unknown
+    last_timestamp = None
+    # True for real-time feeds, where stale frames should be dropped rather than queued
+    is_live = False
+
     def read(self):
         """Return (ret, frame). ret=False when no more frames."""
         raise NotImplementedError
+    def grab(self):
+        """Skip one frame without handing it out (cheaper where the source allows). False at the end."""
+        return self.read()[0]
     def release(self):
         pass
 
 class CameraSource(FrameSource):
-    def __init__(self, device=0):
+    """
+    Live camera feed.
+    With threaded=True a background thread keeps grabbing the newest frames
+    into a small ring buffer, so read() never returns stale driver frames.
+    Failed grabs are retried with a backoff; after max_failures in a row the
+    feed ends.
+    """
+    is_live = True
+    RETRY_DELAY = 0.01  # seconds before the first retry, doubled each time up to 1 s
+
+    def __init__(self, device=0, threaded=False, buffer_size=2, max_failures=10):
         self.cap = cv2.VideoCapture(device)
+        self.threaded = threaded
+        self.max_failures = max_failures
+
+        # Capture info for the last frame handed out by read()
+        self.last_timestamp = None   # time.monotonic() when the frame was grabbed
+        self.dropped_frames = 0      # frames grabbed but never handed out
+
+        self._thread = None
+        self._closing = False
+        if threaded:
+            # Keep the driver's own queue as short as possible
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._buffer = deque(maxlen=buffer_size)
+            self._cond = threading.Condition()
+            self._running = True
+            self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._thread.start()
+
+    def _capture_loop(self):
+        failures = 0
+        while self._running:
+            ret, frame = self.cap.read()
+            t = time.monotonic()
+            if not ret:
+                # A single USB/driver hiccup shouldn't end the feed
+                failures += 1
+                if failures > self.max_failures:
+                    with self._cond:
+                        self._running = False
+                        self._cond.notify()
+                    break
+                time.sleep(min(self.RETRY_DELAY * 2 ** (failures - 1), 1.0))
+                continue
+            failures = 0
+            with self._cond:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped_frames += 1
+                self._buffer.append((frame, t))
+                self._cond.notify()
+        if self._closing:
+            # release() gave up waiting for us, the capture is ours to close
+            self.cap.release()
+
+    def read_latest(self, timeout=1.0):
+        """Return (ret, frame, timestamp, dropped_frames) for the newest frame.
+        Blocks until a frame arrives; ret is False only once capture has stopped.
+        timeout: seconds between checks on the capture thread"""
+        if not self.threaded:
+            ret, frame = self.cap.read()
+            self.last_timestamp = time.monotonic()
+            return ret, frame, self.last_timestamp, self.dropped_frames
+
+        with self._cond:
+            # Wait for a frame we haven't handed out yet. The capture thread may
+            # be backing off after failed grabs, which can take longer than timeout
+            while not self._buffer and self._running:
+                self._cond.wait(timeout)
+            if not self._buffer:
+                return False, None, self.last_timestamp, self.dropped_frames
+            frame, t = self._buffer.pop()
+            # Anything older than the newest frame is stale
+            self.dropped_frames += len(self._buffer)
+            self._buffer.clear()
+        self.last_timestamp = t
+        return True, frame, t, self.dropped_frames
+
     def read(self):
-        return self.cap.read()
+        ret, frame, _, _ = self.read_latest()
+        return ret, frame
+
     def release(self):
+        if self._thread is not None:
+            self._closing = True
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self._thread.join(timeout=1.0)
+            alive = self._thread.is_alive()
+            self._thread = None
+            if alive:
+                return  # still inside cap.read(), the thread releases the capture when it returns
         if self.cap: self.cap.release()
 
 class VideoFileSource(FrameSource):
-    def __init__(self, path):
+    """
+    Frames of a video file, optionally only the range [start_frame, end_frame)
+    (the start is reached by seeking, so several readers can split one file).
+    """
+    def __init__(self, path, start_frame=0, end_frame=None):
         self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or None
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.position = start_frame
+        self.end_frame = end_frame
+        if start_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
     def read(self):
-        return self.cap.read()
+        if self.end_frame is not None and self.position >= self.end_frame:
+            return False, None
+        ret, frame = self.cap.read()
+        if ret:
+            self.position += 1
+            # Position in the file, so filters follow video time rather than wall-clock
+            self.last_timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        return ret, frame
+    def grab(self):
+        if self.end_frame is not None and self.position >= self.end_frame:
+            return False
+        if not self.cap.grab():  # no decode
+            return False
+        self.position += 1
+        return True
     def release(self):
         if self.cap: self.cap.release()
 
 class ImageSource(FrameSource):
+    is_static = True
+
     def __init__(self, path):
         self.frame = cv2.imread(path)  # BGR
         self.done = False
@@ -35,3 +166,102 @@ class ImageSource(FrameSource):
             return True, self.frame.copy()
         self.done = True
         return True, self.frame.copy()
+
+class ImageFolderSource(FrameSource):
+    """Every image in a directory, in file name order, one per read()"""
+    EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+    def __init__(self, directory):
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(self.EXTENSIONS)
+        )
+        self.index = 0
+    def read(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:  # skip unreadable files
+                return True, frame
+        return False, None
+
+class SyntheticSource(FrameSource):
+    """
+    Generated noise frames for load tests (shared and read-only, so nearly free).
+    realtime=True paces read() to fps like a camera; n_frames=None never ends.
+    live=True makes the GUI treat it like a camera.
+    """
+    def __init__(self, width=640, height=480, fps=30, n_frames=None, realtime=False,
+                 live=True, variants=8, seed=0):
+        rng = np.random.default_rng(seed)
+        base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.frames = [np.roll(base, 7 * k, axis=1) for k in range(variants)]
+        for frame in self.frames:
+            frame.flags.writeable = False
+        self.fps = fps
+        self.n_frames = n_frames
+        self.realtime = realtime
+        self.is_live = live
+        self.index = 0
+        self._due = None
+    def read(self):
+        if self.n_frames is not None and self.index >= self.n_frames:
+            return False, None
+        if self.realtime:
+            now = time.monotonic()
+            if self._due is None or now - self._due > 1.0:
+                self._due = now  # first frame, or we fell far behind: don't burst
+            elif now < self._due:
+                time.sleep(self._due - now)
+            self._due += 1.0 / self.fps
+        frame = self.frames[self.index % len(self.frames)]
+        self.last_timestamp = self.index / self.fps
+        self.index += 1
+        return True, frame
+
+def recording_paths(path):
+    """(frames .npy, sidecar .json) of a recording (core.recorder), given either file or the bare name"""
+    base = path[:-5] if path.endswith(".json") else path[:-4] if path.endswith(".npy") else path
+    return base + ".npy", base + ".json"
+
+class MmapFrameSource(FrameSource):
+    """
+    Replays a recording made by core.recorder.FrameRecorder, optionally only
+    the range [start_frame, end_frame). Frames are read-only views into the
+    memory-mapped file (no decode, no copy) and timestamps are the recorded
+    ones, so every replay is frame-exact and identical.
+    """
+    def __init__(self, path, start_frame=0, end_frame=None):
+        npy_path, json_path = recording_paths(path)
+        with open(json_path) as f:
+            self.meta = json.load(f)
+        # A plain ndarray view of the mapping, OpenCV takes it as is
+        self.frames = np.asarray(np.load(npy_path, mmap_mode='r'))
+        self.timestamps = self.meta['timestamps']
+        self.fps = self.meta.get('fps')
+        self.frame_count = len(self.frames)
+        self.position = start_frame
+        self.end_frame = self.frame_count if end_frame is None else min(end_frame, self.frame_count)
+    def read(self):
+        if self.position >= self.end_frame:
+            return False, None
+        frame = self.frames[self.position]
+        self.last_timestamp = self.timestamps[self.position]
+        self.position += 1
+        return True, frame
+    def grab(self):
+        if self.position >= self.end_frame:
+            return False
+        self.position += 1
+        return True
+    def release(self):
+        self.frames = None  # unmaps once the last view is gone
+
+def file_source(path, start_frame=0, end_frame=None):
+    """
+    Source for frames [start_frame, end_frame) of a recorded file: a recording
+    (.npy) replays memory-mapped, anything else is decoded
+    """
+    if path.endswith(".npy"):
+        return MmapFrameSource(path, start_frame, end_frame)
+    return VideoFileSource(path, start_frame, end_frame)
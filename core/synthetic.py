@@ -0,0 +1,183 @@
+"""
+Synthetic landmark trajectories: a side-view stick figure moving into a front
+split or forward fold, as (T, 33, 4) pixel landmarks like LandmarkFrame rows.
+"""
+
+import numpy as np
+import mediapipe as mp
+
+from core.landmarks import NUM_LANDMARKS
+from core.pose_estimator import array_to_results
+
+# Segment lengths as fractions of the person's standing height
+TORSO, HEAD, UPPER_ARM, FOREARM, THIGH, SHIN, FOOT = 0.30, 0.12, 0.17, 0.15, 0.24, 0.24, 0.06
+# Left/right offset (depth in a side view), so paired landmarks don't coincide
+SIDE = 0.02
+
+# Furthest each pose goes at depth 1: leg angle from vertical / torso angle from vertical
+MAX_SPLIT_ANGLE = np.radians(90)
+MAX_FOLD_ANGLE = np.radians(130)
+
+
+def depth_profile(n_frames, peak=0.9, wobble=0.02, fps=30):
+    """
+    0 -> peak -> 0 over the sequence: a quarter easing in, half holding (with a
+    slow wobble), a quarter easing out
+    """
+    u = np.linspace(0, 1, n_frames)
+    ramp = np.clip(np.minimum(u, 1 - u) * 4, 0, 1)
+    ease = ramp * ramp * (3 - 2 * ramp)  # smoothstep
+    t = np.arange(n_frames) / fps
+    return peak * ease * (1 + wobble * np.sin(2 * np.pi * 0.5 * t) * (ramp == 1))
+
+
+def skeleton(pose, depth, width=640, height=480, body=0.8):
+    """
+    (T, 33, 4) pixel landmarks of the figure at each depth in [0, 1].
+    body: standing height as a fraction of the image height.
+    """
+    depth = np.atleast_1d(np.asarray(depth, dtype=np.float64))
+    T = len(depth)
+    H = body * height
+    floor = 0.95 * height
+    cx = 0.5 * width
+    down = np.array([0.0, 1.0])
+
+    def seg(start, direction, length):
+        return start + direction * (length * H)
+
+    def unit(angle):
+        # angle from straight down, positive towards +x (the figure faces +x)
+        return np.stack([np.sin(angle), np.cos(angle)], axis=-1)
+
+    pts = np.zeros((T, NUM_LANDMARKS, 2))
+    leg = THIGH + SHIN
+
+    if pose == 'front_split':
+        a = depth * MAX_SPLIT_ANGLE
+        front, back = unit(a), unit(-0.97 * a)  # slightly uneven, like a real split
+        hip = np.stack([np.full(T, cx), floor - leg * H * np.cos(a)], axis=-1)
+        torso_dir = np.tile([0.0, -1.0], (T, 1))
+        legs = ((23, 25, 27, front), (24, 26, 28, back))
+    elif pose == 'forward_fold':
+        hip = np.tile([cx - 0.1 * H, floor - leg * H], (T, 1))
+        torso_dir = -unit(-depth * MAX_FOLD_ANGLE)
+        legs = ((23, 25, 27, np.tile(down, (T, 1))), (24, 26, 28, np.tile(down, (T, 1))))
+    else:
+        raise ValueError(f"Unknown pose: {pose}")
+
+    shoulder = seg(hip, torso_dir, TORSO)
+    nose = seg(shoulder, torso_dir, HEAD)
+    for side, sign in ((0, -1), (1, 1)):
+        offset = np.array([sign * SIDE * H, 0.0])
+        hip_i, knee_i, ankle_i, direction = legs[side]
+        pts[:, hip_i] = hip + offset
+        pts[:, knee_i] = seg(pts[:, hip_i], direction, THIGH)
+        pts[:, ankle_i] = seg(pts[:, knee_i], direction, SHIN)
+        # heel behind the ankle, toes in front, along the floor
+        pts[:, 29 + side] = pts[:, ankle_i] + [-0.3 * FOOT * H, 0.3 * FOOT * H]
+        pts[:, 31 + side] = pts[:, ankle_i] + [FOOT * H, 0.5 * FOOT * H]
+
+        # arms hang from the shoulders
+        pts[:, 11 + side] = shoulder + offset
+        pts[:, 13 + side] = seg(pts[:, 11 + side], down, UPPER_ARM)
+        pts[:, 15 + side] = seg(pts[:, 13 + side], down, FOREARM)
+        for k, dx in zip((17, 19, 21), (0.02, 0.03, -0.01)):  # pinky, index, thumb
+            pts[:, k + side] = pts[:, 15 + side] + [dx * H, 0.03 * H]
+
+    # face around the nose
+    face = np.array([[0.01, -0.02], [0.015, -0.02], [0.02, -0.02], [-0.01, -0.02],
+                     [-0.015, -0.02], [-0.02, -0.02], [0.03, -0.01], [-0.03, -0.01],
+                     [0.01, 0.02], [-0.01, 0.02]])
+    pts[:, 0] = nose
+    pts[:, 1:11] = nose[:, None] + face * H
+
+    out = np.zeros((T, NUM_LANDMARKS, 4), dtype=np.float32)
+    out[:, :, :2] = pts
+    out[:, :, 3] = 0.95
+    return out
+
+
+def synthetic_sequence(pose='front_split', n_frames=300, fps=30, width=640, height=480,
+                       peak=0.9, noise_px=1.5, dropout=0.02, seed=0):
+    """
+    A recording-like sequence: depth_profile motion, Gaussian landmark jitter
+    (noise_px), slightly varying visibility and a fraction of frames without a pose.
+    Returns (landmarks (T, 33, 4) float32, timestamps (T,) seconds).
+    """
+    rng = np.random.default_rng(seed)
+    landmarks = skeleton(pose, depth_profile(n_frames, peak, fps=fps), width, height)
+    landmarks[:, :, :2] += rng.normal(0, noise_px, landmarks[:, :, :2].shape)
+    landmarks[:, :, 3] = np.clip(rng.normal(0.9, 0.05, landmarks.shape[:2]), 0, 1)
+    landmarks[rng.random(n_frames) < dropout] = np.nan
+    timestamps = np.arange(n_frames) / fps
+    return landmarks, timestamps
+
+
+class SyntheticPoseEstimator:
+    """
+    PoseEstimator stand-in emitting the synthetic figure, sweeping to `peak` depth
+    and back every `period` seconds. pose may be a callable (the GUI's selection).
+    """
+
+    # Depth resolution of the precomputed skeleton table
+    LEVELS = 256
+
+    def __init__(self, pose='front_split', period=6.0, peak=0.9, noise_px=1.5,
+                 dropout=0.02, draw=True, fps=30, seed=0):
+        self.pose = pose
+        self.period = period
+        self.peak = peak
+        self.noise_px = noise_px
+        self.dropout = dropout
+        self.draw = draw
+        self.fps = fps
+        self.seed = seed
+        self.mp_pose = mp.solutions.pose
+        self.mp_drawing = mp.solutions.drawing_utils
+        self._tables = {}  # (pose, w, h) -> (LEVELS, 33, 4) skeletons
+        self.reset()
+
+    def reset(self):
+        self.rng = np.random.default_rng(self.seed)
+        self.count = 0
+
+    def settings(self):
+        return {
+            'synthetic': self.pose if isinstance(self.pose, str) else 'dynamic',
+            'period': self.period, 'peak': self.peak, 'noise_px': self.noise_px,
+            'dropout': self.dropout, 'seed': self.seed,
+        }
+
+    def depth(self, t):
+        """Sweep 0 -> peak -> 0 once per period"""
+        return self.peak * 0.5 * (1 - np.cos(2 * np.pi * t / self.period))
+
+    def process_frame(self, frame, timestamp=None):
+        if timestamp is None:
+            timestamp = self.count / self.fps
+        self.count += 1
+
+        image = frame.copy()
+        if self.rng.random() < self.dropout:
+            return image, array_to_results(None)
+
+        h, w = frame.shape[:2]
+        pose = self.pose() if callable(self.pose) else self.pose
+        table = self._tables.get((pose, w, h))
+        if table is None:
+            table = self._tables[(pose, w, h)] = skeleton(
+                pose, np.linspace(0, 1, self.LEVELS), w, h)
+        arr = table[int(round(self.depth(timestamp) * (self.LEVELS - 1)))].copy()
+        arr[:, :2] += self.rng.normal(0, self.noise_px, (NUM_LANDMARKS, 2))
+        arr[:, 0] /= w
+        arr[:, 1] /= h
+        results = array_to_results(arr)
+        if self.draw:
+            self.mp_drawing.draw_landmarks(
+                image, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS
+            )
+        return image, results
+
+    def close(self):
+        pass
@@ -1,5 +1,23 @@
 import numpy as np
 
+
+def _time_step(kf, t):
+    """
+    F and Q for the time since the filter's previous predict: the real gap when
+    timestamps are given, else the nominal dt. Q grows linearly with the gap.
+    """
+    dt = kf.dt
+    if t is not None:
+        if kf.t_prev is not None and t > kf.t_prev:
+            dt = t - kf.t_prev
+        kf.t_prev = t
+    if dt == kf.dt:
+        return kf.F, kf.Q
+    F = kf.F.copy()
+    F[0, 2] = F[1, 3] = dt
+    return F, kf.Q * (dt / kf.dt)
+
+
 class Kalman2D:
     def __init__(self, dt=1/30, process_var=1e-2, meas_var=5.0):
         self.dt = dt
@@ -19,13 +37,17 @@ class Kalman2D:
 
         # Covariances
         self.P = np.eye(4) * 500.0           # initial uncertainty
-        self.Q = np.eye(4) * process_var     # process noise
+        self.Q = np.eye(4) * process_var     # process noise (per nominal dt step)
         self.R = np.eye(2) * meas_var        # measurement noise
 
-    def predict(self):
+        self.t_prev = None
+
+    def predict(self, t=None):
+        """Predict to timestamp t (seconds), or one nominal dt ahead"""
+        F, Q = _time_step(self, t)
         # Predict next state
-        self.x = np.dot(self.F, self.x)
-        self.P = np.dot(self.F, np.dot(self.P, self.F.T)) + self.Q
+        self.x = np.dot(F, self.x)
+        self.P = np.dot(F, np.dot(self.P, F.T)) + Q
         return self.x[:2].flatten()  # return [x, y]
 
     def update(self, z):
@@ -48,3 +70,171 @@ class Kalman2D:
         self.P = (I - np.dot(K, self.H)) @ self.P
 
         return self.x[:2].flatten()
+
+
+class KalmanBank:
+    """
+    Kalman2D's constant-velocity model for K points at once.
+    State is stacked as x (K, 4) = [x, y, vx, vy] and P (K, 4, 4); the 2x2
+    innovation covariance is inverted in closed form, no np.linalg.inv.
+    With steady_state=True a single precomputed gain is used for every point and
+    no covariance is tracked at all (cheapest; exact once the filter has settled).
+    """
+    def __init__(self, n_points, dt=1/30, process_var=1e-2, meas_var=5.0,
+                 steady_state=False, initial_var=500.0):
+        self.n_points = n_points
+        self.dt = dt
+        self.process_var = process_var
+        self.meas_var = meas_var
+        self.initial_var = initial_var
+        self.steady_state = steady_state
+
+        self.F = np.array([[1, 0, dt, 0],
+                           [0, 1, 0, dt],
+                           [0, 0, 1, 0],
+                           [0, 0, 0, 1]], dtype=np.float64)
+        self.Q = np.eye(4) * process_var
+
+        self.x = np.zeros((n_points, 4))
+        self.P = np.tile(np.eye(4) * initial_var, (n_points, 1, 1))
+        self.gain = self._steady_state_gain() if steady_state else None
+        self.t_prev = None
+
+    def _steady_state_gain(self, tol=1e-10, max_iter=10000):
+        """Iterate the covariance recursion for one point until the gain stops changing"""
+        P = np.eye(4) * self.initial_var
+        K = np.zeros((4, 2))
+        for _ in range(max_iter):
+            P = self.F @ P @ self.F.T + self.Q
+            S = P[:2, :2] + np.eye(2) * self.meas_var
+            K_new = P[:, :2] @ np.linalg.inv(S)
+            P = P - K_new @ P[:2, :]
+            if np.abs(K_new - K).max() < tol:
+                break
+            K = K_new
+        return K_new
+
+    def initialize(self, z, t=None):
+        """Start every point at the measured position (K, 2) with zero velocity"""
+        self.x[:, :2] = z
+        self.x[:, 2:] = 0
+        self.P[:] = np.eye(4) * self.initial_var
+        self.t_prev = t
+
+    def predict(self, t=None):
+        """Predict to timestamp t (seconds), or one nominal dt ahead"""
+        F, Q = _time_step(self, t)
+        # x = F x, written out for the constant-velocity model
+        self.x[:, :2] += self.x[:, 2:] * F[0, 2]
+        if not self.steady_state:
+            # (the steady-state gain assumes the nominal dt)
+            self.P = F @ self.P @ F.T + Q
+        return self.x[:, :2].copy()
+
+    def update(self, z):
+        """z: (K, 2) measurements; rows containing NaN are skipped"""
+        z = np.asarray(z, dtype=np.float64)
+        valid = ~np.isnan(z).any(axis=1)
+        y = np.where(valid[:, None], z - self.x[:, :2], 0.0)
+
+        if self.steady_state:
+            self.x += y @ self.gain.T
+            return self.x[:, :2].copy()
+
+        # S = H P H^T + R and its closed-form 2x2 inverse
+        a = self.P[:, 0, 0] + self.meas_var
+        b = self.P[:, 0, 1]
+        c = self.P[:, 1, 0]
+        d = self.P[:, 1, 1] + self.meas_var
+        det = a * d - b * c
+        S_inv = np.empty((self.n_points, 2, 2))
+        S_inv[:, 0, 0] = d / det
+        S_inv[:, 0, 1] = -b / det
+        S_inv[:, 1, 0] = -c / det
+        S_inv[:, 1, 1] = a / det
+
+        # K = P H^T S^-1, zero gain for missing measurements
+        K = self.P[:, :, :2] @ S_inv
+        K[~valid] = 0
+
+        self.x += np.einsum('kij,kj->ki', K, y)
+        self.P = self.P - K @ self.P[:, :2, :]
+        return self.x[:, :2].copy()
+
+
+def rts_smooth(z, dt=1/30, process_var=1e-2, meas_var=5.0, timestamps=None,
+               initial_var=500.0):
+    """
+    Zero-lag Rauch-Tung-Striebel smoothing of a (T, ...) sequence with Kalman2D's model,
+    every channel as its own [position, velocity] filter (Q and R are diagonal).
+    NaN = missing: gaps are filled in, the ends before/after the measurements stay NaN.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    shape = z.shape
+    z = z.reshape(len(z), -1)
+    T, M = z.shape
+    out = np.full((T, M), np.nan)
+    if T == 0:
+        return out.reshape(shape)
+
+    valid = ~np.isnan(z)
+    steps = np.full(T, dt, dtype=np.float64)
+    if timestamps is not None:
+        gaps = np.diff(np.asarray(timestamps, dtype=np.float64))
+        steps[1:] = np.where(gaps > 0, gaps, dt)
+    q = process_var * steps / dt
+
+    # Filtered and one-step predicted state per frame; P is symmetric: (p00, p01, p11)
+    xf = np.empty((T, 2, M))
+    Pf = np.empty((T, 3, M))
+    xp = np.empty((T, 2, M))
+    Pp = np.empty((T, 3, M))
+
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), 0)
+    x = np.stack([z[first, np.arange(M)], np.zeros(M)])
+    x[np.isnan(x)] = 0
+    P = np.stack([np.full(M, initial_var), np.zeros(M), np.full(M, initial_var)])
+
+    for t in range(T):
+        if t > 0:
+            s = steps[t]
+            x = np.stack([x[0] + s * x[1], x[1]])
+            P = np.stack([P[0] + 2 * s * P[1] + s * s * P[2] + q[t],
+                          P[1] + s * P[2],
+                          P[2] + q[t]])
+        xp[t], Pp[t] = x, P
+
+        # Scalar innovation per channel, zero gain where the sample is missing
+        S = P[0] + meas_var
+        k0 = np.where(valid[t], P[0] / S, 0.0)
+        k1 = np.where(valid[t], P[1] / S, 0.0)
+        y = np.where(valid[t], z[t] - x[0], 0.0)
+        x = np.stack([x[0] + k0 * y, x[1] + k1 * y])
+        P = np.stack([(1 - k0) * P[0], (1 - k0) * P[1], P[2] - k1 * P[1]])
+        xf[t], Pf[t] = x, P
+
+    # Backward pass: x_s[t] = x_f[t] + C (x_s[t+1] - x_p[t+1]), C = P_f F^T P_p^-1
+    xs = xf[-1]
+    out[-1] = xs[0]
+    for t in range(T - 2, -1, -1):
+        s = steps[t + 1]
+        a, b, c = Pf[t]
+        pa, pb, pc = Pp[t + 1]
+        det = pa * pc - pb * pb
+        # P_f F^T = [[a + s b, b], [b + s c, c]]
+        m00, m01, m10, m11 = a + s * b, b, b + s * c, c
+        C00 = (m00 * pc - m01 * pb) / det
+        C01 = (m01 * pa - m00 * pb) / det
+        C10 = (m10 * pc - m11 * pb) / det
+        C11 = (m11 * pa - m10 * pb) / det
+        d0 = xs[0] - xp[t + 1, 0]
+        d1 = xs[1] - xp[t + 1, 1]
+        xs = np.stack([xf[t, 0] + C00 * d0 + C01 * d1,
+                       xf[t, 1] + C10 * d0 + C11 * d1])
+        out[t] = xs[0]
+
+    # Don't extrapolate past the ends of each channel's measurements
+    before = np.cumsum(valid, axis=0) == 0
+    after = np.cumsum(valid[::-1], axis=0)[::-1] == 0
+    out[before | after] = np.nan
+    return out.reshape(shape)
@@ -3,6 +3,15 @@ Handles MediaPipe pose landmark stabilization
 """
 
 import math
+
+import numpy as np
+
+# OneEuro's defaults are tuned for angles in degrees. For pixel landmark
+# coordinates (jitter of a few px, movements of hundreds of px/s) these give
+# the lowest error on the synthetic sequences in core.synthetic
+LANDMARK_MIN_CUTOFF = 0.5
+LANDMARK_BETA = 0.1
+
 class OneEuro:
     def __init__(self, freq, min_cutoff=2.0, beta=0.005, d_cutoff=1.0):
 
@@ -15,23 +24,71 @@ class OneEuro:
         # Previous values
         self.x_prev = None
         self.dx_prev = None
+        self.t_prev = None
+
+    def _period(self, t):
+        """Seconds since the previous sample: real when timestamps are given, else 1/freq"""
+        te = 1.0 / self.freq
+        if t is not None:
+            if self.t_prev is not None and t > self.t_prev:
+                te = t - self.t_prev
+            self.t_prev = t
+        return te
 
-    def _alpha(self, cutoff):
+    def _alpha(self, cutoff, te=None):
         tau = 1.0 / (2.0 * math.pi * cutoff)
-        te = 1.0 / self.freq # period between samples
+        if te is None:
+            te = 1.0 / self.freq # period between samples
         return 1.0 / (1.0 + tau/te)
 
-    def __call__(self, x):
+    def __call__(self, x, t=None):
+        """Filter one sample; t is its timestamp in seconds (optional)"""
+        te = self._period(t)
+
         # derivative
-        dx = 0.0 if self.x_prev is None else (x - self.x_prev) * self.freq
-        ad = self._alpha(self.d_cutoff)
+        dx = 0.0 if self.x_prev is None else (x - self.x_prev) / te
+        ad = self._alpha(self.d_cutoff, te)
 
         # Exponenttial smoothing factor
         dx_hat = dx if self.dx_prev is None else ad*dx + (1-ad)*self.dx_prev
 
 
         cutoff = self.min_cutoff + self.beta * abs(dx_hat)
-        a = self._alpha(cutoff)
+        a = self._alpha(cutoff, te)
         x_hat = x if self.x_prev is None else a*x + (1-a)*self.x_prev
         self.x_prev, self.dx_prev = x_hat, dx_hat
         return x_hat
+
+
+class OneEuroBank(OneEuro):
+    """
+    Same filter as OneEuro for a whole array of signals per call,
+    e.g. all (33, 3) landmark coordinates. State lives in NumPy arrays.
+    """
+    def reset(self):
+        self.x_prev = None
+        self.dx_prev = None
+        self.t_prev = None
+
+    def _alpha(self, cutoff, te):
+        # 1 / (1 + tau/te) with tau = 1/(2*pi*cutoff); works on arrays
+        return 1.0 / (1.0 + 1.0 / (2.0 * math.pi * cutoff * te))
+
+    def __call__(self, x, t=None):
+        """Filter one array of samples; t is their timestamp in seconds (optional)"""
+        te = self._period(t)
+        x = np.asarray(x, dtype=np.float64)
+        if self.x_prev is None:
+            self.x_prev = x.copy()
+            self.dx_prev = np.zeros_like(x)
+            return x.copy()
+
+        # derivative, smoothed with the fixed derivative cutoff
+        ad = self._alpha(self.d_cutoff, te)
+        dx_hat = ad * (x - self.x_prev) / te + (1 - ad) * self.dx_prev
+
+        # per-signal cutoff grows with speed
+        a = self._alpha(self.min_cutoff + self.beta * np.abs(dx_hat), te)
+        x_hat = a * x + (1 - a) * self.x_prev
+        self.x_prev, self.dx_prev = x_hat, dx_hat
+        return x_hat.copy()
@@ -4,16 +4,25 @@ from tkinter import ttk, filedialog, messagebox
 import cv2
 from PIL import Image, ImageTk
 from datetime import datetime, timedelta
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
-from core.sources import CameraSource, VideoFileSource, ImageSource
-from filters.oneEuro import OneEuro
-from filters.kalman2D import Kalman2D
+import threading
+import time
+from collections import deque
+import numpy as np
+
+from core.sources import CameraSource, VideoFileSource, ImageSource, MmapFrameSource, file_source
+from core.pipeline import Pipeline
+from core.landmarks import LandmarkFrame
+from core.landmark_cache import CachingEstimator
+from core.batch import smooth_recording, sequence_best
+from core.latency import timed, END_TO_END
+from filters.oneEuro import OneEuro, OneEuroBank, LANDMARK_MIN_CUTOFF, LANDMARK_BETA
+from gui.plots import RollingPlot
 
 class GUIApp(tk.Tk):
-    def __init__(self, estimator, analyzer, session):
+    def __init__(self, estimator, analyzer, session, landmark_cache=None, smooth_landmarks=False,
+                 latency_stats=None, latency_hud=False, camera_source=None, live_estimator=None):
         super().__init__()
         self.title("Flexibility Progress Tracker")
         self.geometry("1100x800")
@@ -36,20 +45,48 @@ class GUIApp(tk.Tk):
         self.setup_styles()
 
         self.estimator = estimator
+        # Estimator for live sources (e.g. motion-gated), defaults to estimator
+        self.live_estimator = live_estimator or estimator
+        # Estimator used for the current source (may wrap self.estimator)
+        self.active_estimator = estimator
+        # Optional LandmarkCache so re-opened videos skip MediaPipe
+        self.landmark_cache = landmark_cache
+        # Optional callable returning the source used instead of the webcam (load tests)
+        self.camera_source = camera_source
         self.analyzer = analyzer
         # self.available_poses = analyzer.get_available_poses()
         self.session = session
         self.angle_filter = OneEuro(freq=30)
-        self.kf_wrist = Kalman2D(dt=1/30)
-        self.kf_initialized = False
+        # Optional One Euro smoothing of every landmark before analysis
+        self.landmark_filter = (OneEuroBank(freq=30, min_cutoff=LANDMARK_MIN_CUTOFF,
+                                            beta=LANDMARK_BETA)
+                                if smooth_landmarks else None)
+
+        # Test-mode metric plot (gui.plots.RollingPlot), built with the main interface
+        self.plot = None
+
+        # Reused every frame by the analysis stage
+        self.landmark_frame = LandmarkFrame()
+
+        # Optional per-stage timings (core.latency.LatencyStats), drawn on the video with latency_hud
+        self.latency_stats = latency_stats
+        self.latency_hud = latency_hud and latency_stats is not None
+
+        # Test-mode samples produced by the analysis stage, drained on the Tk thread
+        self.plot_samples = deque()
 
-        # Always initialize lists for plotting
-        self.timestamps = []
-        self.raw_angles = []
-        self.filtered_angles = []
+        # Raw pixel landmarks and timestamps of a video file, for the offline pass
+        self.recorded_landmarks = None
+        self.recorded_timestamps = None
+        self.recorded_size = None
+        # The video's landmarks are in the cache: frames are only decoded for display
+        self.cache_hit = False
 
-        # current source
+        # current source and the pipeline processing it
         self.source = None
+        self.pipeline = None
+        # Guards session/filter state shared between the analysis worker and Tk
+        self.state_lock = threading.Lock()
         
         # Display dimensions for consistent aspect ratio
         self.display_width = 640
@@ -301,23 +338,10 @@ class GUIApp(tk.Tk):
 
             # Configure matplotlib with colors
             plt.style.use('default')
-            self.fig = Figure(figsize=(6, 4), dpi=100, facecolor=self.colors['surface'])
-            self.ax = self.fig.add_subplot(111)
-            self.ax.set_facecolor('#fafafa')
-            self.ax.grid(True, alpha=0.3, color=self.colors['text_secondary'])
-            self.ax.spines['top'].set_visible(False)
-            self.ax.spines['right'].set_visible(False)
-            self.ax.spines['left'].set_color(self.colors['text_secondary'])
-            self.ax.spines['bottom'].set_color(self.colors['text_secondary'])
-            
-            self.ax.set_title("Angle over Time", fontsize=12, color=self.colors['text_primary'], pad=20)
-            self.ax.set_xlabel("Time (s)", color=self.colors['text_secondary'])
-            self.ax.set_ylabel("Angle (degrees)", color=self.colors['text_secondary'])
-
-            self.canvas = FigureCanvasTkAgg(self.fig, master=plot_section)
-            plot_widget = self.canvas.get_tk_widget()
-            plot_widget.configure(bg=self.colors['surface'])
-            plot_widget.pack(fill=tk.BOTH, expand=True)
+            self.plot = RollingPlot(plot_section, self.colors, *self.plot_labels(),
+                                    fps=self.plot_fps())
+        else:
+            self.plot = None
 
         # Controls section at bottom
         controls_section = ttk.Frame(self.main_frame, style='Card.TFrame', padding=15)
@@ -361,10 +385,8 @@ class GUIApp(tk.Tk):
         return resized
 
     def back_to_selection(self):
-        # Release current source
-        if self.source:
-            self.source.release()
-            self.source = None
+        # Stop processing and release current source
+        self.stop_pipeline()
         
         # Reset best value
         self.session.best_value = None
@@ -374,10 +396,6 @@ class GUIApp(tk.Tk):
 
     def select_test(self):
         self.session.mode = True
-        # Reset test-mode data
-        self.timestamps = []
-        self.raw_angles = []
-        self.filtered_angles = []
 
     def select_camera(self):
 
@@ -386,14 +404,15 @@ class GUIApp(tk.Tk):
         self.session.pose_name = self.analyzer.get_pose_name()
 
         self.session.best_value = None
-        self.set_source(CameraSource(0))
+        self.set_source(self.open_camera())
         self.show_main_interface()
         self.after(0, self.update_frame)
 
     def select_video(self):
         path = filedialog.askopenfilename(
             title="Select Video File",
-            filetypes=[("Video files", "*.mp4;*.mov;*.avi;*.mkv"), ("All files", "*.*")]
+            filetypes=[("Video files", "*.mp4;*.mov;*.avi;*.mkv"), ("Recorded sessions", "*.npy"),
+                       ("All files", "*.*")]
         )
         if not path: 
             return
@@ -404,7 +423,7 @@ class GUIApp(tk.Tk):
 
 
         self.session.best_value = None
-        self.set_source(VideoFileSource(path))
+        self.set_source(file_source(path), self.video_estimator(path))
         self.show_main_interface()
         self.after(0, self.update_frame)
 
@@ -425,27 +444,72 @@ class GUIApp(tk.Tk):
         self.show_main_interface()
         self.after(0, self.update_frame)
 
-    def set_source(self, src):
+    def open_camera(self):
+        if self.camera_source is not None:
+            return self.camera_source()
+        return CameraSource(0, threaded=True)
+
+    def video_estimator(self, path):
+        """Estimator for a video file, backed by the landmark cache when there is one"""
+        if self.landmark_cache is None or not hasattr(self.estimator, 'settings'):
+            return None
+        return CachingEstimator(self.estimator, self.landmark_cache, path)
+
+    def set_source(self, src, estimator=None):
         # release old
-        if self.source:
-            self.source.release()
+        self.stop_pipeline()
         self.source = src
-
-        self.kf_wrist = Kalman2D(dt=1/30)  # Reset filter for new source
-        self.kf_initialized = False
+        if self.plot is not None:
+            self.plot.clear(fps=self.plot_fps())  # plot_samples went with the old source
+        self.active_estimator = estimator or (self.live_estimator if src.is_live else self.estimator)
+
+        self.angle_filter = OneEuro(freq=30)  # timestamps restart with the source
+        if self.landmark_filter is not None:
+            self.landmark_filter.reset()
+        # Video files get a zero-lag smoothing pass over the whole recording at the end
+        # (a cache hit has the whole recording already)
+        self.cache_hit = getattr(self.active_estimator, 'hit', False)
+        video = isinstance(src, (VideoFileSource, MmapFrameSource)) and not self.cache_hit
+        self.recorded_landmarks = [] if video else None
+        self.recorded_timestamps = [] if video else None
+
+        # Live camera drops stale frames between stages, files process every frame
+        # (cache hits too can drop, so only frames that make it to the screen are
+        # drawn). Unchanged camera frames reuse the last results (file frames must
+        # all reach the estimator so landmark cache indices stay aligned).
+        live = src.is_live
+        self.pipeline = Pipeline(
+            src,
+            [self.inference_stage, self.analysis_stage, self.render_stage],
+            drop_frames=live or self.cache_hit,
+            skip_duplicates=live,
+            stats=self.latency_stats
+        )
+        self.pipeline.start()
+
+    def stop_pipeline(self):
+        """Stop processing and release the current source"""
+        if self.pipeline:
+            self.pipeline.stop(release_source=True)
+            self.pipeline = None
+        elif self.source:
+            self.source.release()
+        self.source = None
+        self.plot_samples.clear()
 
     def use_camera(self):
         self.session.best_value = None
-        self.set_source(CameraSource(0))
+        self.set_source(self.open_camera())
         self.after(0, self.update_frame)
         
     def open_video(self):
         path = filedialog.askopenfilename(
-            filetypes=[("Video files", "*.mp4;*.mov;*.avi;*.mkv"), ("All files", "*.*")]
+            filetypes=[("Video files", "*.mp4;*.mov;*.avi;*.mkv"), ("Recorded sessions", "*.npy"),
+                       ("All files", "*.*")]
         )
         if not path: return
         self.session.best_value = None
-        self.set_source(VideoFileSource(path))
+        self.set_source(file_source(path), self.video_estimator(path))
         self.after(0, self.update_frame)
 
     def open_image(self):
@@ -459,26 +523,26 @@ class GUIApp(tk.Tk):
 
     def test_mode(self):
         if (datetime.now() - self.session.session_start) > timedelta(seconds=60):
-            self.session.save_result()
-            msg = (
-            f"Best value: {self.session.best_value:.2f}°\n"
-            f"Worst value: {self.session.worst_value:.2f}°\n"
-            f"Error range (Jitter): {(self.session.best_value - self.session.worst_value):.2f}°\n"
-            f"Observed Average: {(self.session.sum/self.session.count):.2f}°"
-            )
-
-            messagebox.showinfo("Session Complete", msg)
-
-            self.session.best_value = None
-            self.session.worst_value = None
-            self.session.count = 0
-            self.session.sum = 0
-            self.session.session_start = datetime.now() 
+            with self.state_lock:
+                self.session.save_result()
+                msg = (
+                f"Best value: {self.session.best_value:.2f}°\n"
+                f"Worst value: {self.session.worst_value:.2f}°\n"
+                f"Error range (Jitter): {(self.session.best_value - self.session.worst_value):.2f}°\n"
+                f"Observed Average: {(self.session.sum/self.session.count):.2f}°"
+                )
+
+                self.session.best_value = None
+                self.session.worst_value = None
+                self.session.count = 0
+                self.session.sum = 0
+                self.session.session_start = datetime.now() 
 
             # Reset test-mode data
-            self.timestamps = []
-            self.raw_angles = []
-            self.filtered_angles = []
+            self.plot_samples.clear()
+            self.plot.clear()
+
+            messagebox.showinfo("Session Complete", msg)
 
         else:
             return
@@ -487,104 +551,188 @@ class GUIApp(tk.Tk):
         self.session.save_result()
         messagebox.showinfo("✅ Saved Successfully", f"Best flexibility value saved: {self.session.best_value:.2f}°")
 
-    def update_frame(self):
-        if self.source is None:
-            return
-
-        ret, frame = self.source.read()
-        if not ret or frame is None:
-            # End of video: stop loop (or switch back to camera if you prefer)
-            return
-
-        # Process with MediaPipe
-        frame_bgr, results = self.estimator.process_frame(frame)
-
-        # === NEW: Use MultiPoseAnalyzer ===
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
-            h, w, _ = frame_bgr.shape
+    # === Pipeline stages (run on worker threads, must not touch Tk widgets) ===
+
+    def inference_stage(self, item):
+        """Run MediaPipe and draw the skeleton"""
+        if self.cache_hit:
+            # By frame index, frames may have been dropped on the way
+            item['image'], item['results'] = self.active_estimator.replay(
+                item['index'], item['frame'])
+            return item
+        item['image'], item['results'] = self.active_estimator.process_frame(
+            item['frame'], item['timestamp'])
+        return item
+
+    def analysis_stage(self, item):
+        """Analyze the pose, update the session and draw metric overlays"""
+        frame_bgr = item['image']
+        results = item['results']
+
+        h, w, _ = frame_bgr.shape
+        found = self.landmark_frame.fill_from_results(results, w, h)
+        if self.recorded_landmarks is not None:
+            # Before any causal filtering; NaN rows keep frame indices aligned
+            self.recorded_landmarks.append(
+                self.landmark_frame.data.copy() if found
+                else np.full_like(self.landmark_frame.data, np.nan))
+            self.recorded_timestamps.append(item['timestamp'])
+            self.recorded_size = (w, h)
+        if found:
+            lf = self.landmark_frame
+            if self.landmark_filter is not None:
+                lf.data[:, :3] = self.landmark_filter(lf.data[:, :3], item['timestamp'])
             
             # Analyze the selected pose
-            pose_results = self.analyzer.analyze(lm, w, h, frame_bgr)
+            with timed(self.latency_stats, 'analysis'):
+                pose_results = self.analyzer.analyze(lf, w, h, frame_bgr)
             
             # Get the primary metric (automatically switches based on pose type)
             if pose_results['confidence'] > 0.5:  # Only track if confident
                 raw_metric = pose_results['primary_metric']
-                smoothed_metric = self.angle_filter(raw_metric)
+                with self.state_lock:
+                    smoothed_metric = self.angle_filter(raw_metric, item['timestamp'])
+                    
+                    # Update session with smoothed value
+                    self.session.update_best(smoothed_metric)
                 
-                # Update session with smoothed value
-                self.session.update_best(smoothed_metric)
+                with timed(self.latency_stats, 'overlay'):
+                    # Display metric on screen
+                    metric_text = f"{smoothed_metric:.1f}{self.analyzer.get_metric_unit()}"
                 
-                # Display metric on screen
-                metric_text = f"{smoothed_metric:.1f}{self.analyzer.get_metric_unit()}"
+                    # Find a good position based on pose type
+                    if self.analyzer.current_pose == 'front_split':
+                        # Display near hips
+                        hip_x, hip_y = (lf.xy(23) + lf.xy(24)) / 2
+                        pos = (int(hip_x), int(hip_y) - 40)
+                    else:  # forward_fold or other
+                        # Display near center top
+                        pos = (int(w / 2) - 100, 50)
                 
-                # Find a good position based on pose type
-                if self.analyzer.current_pose == 'front_split':
-                    # Display near hips
-                    hip_x = int((lm[23].x + lm[24].x) / 2 * w)
-                    hip_y = int((lm[23].y + lm[24].y) / 2 * h)
-                    pos = (hip_x, hip_y - 40)
-                else:  # forward_fold or other
-                    # Display near center top
-                    pos = (int(w / 2) - 100, 50)
+                    cv2.putText(frame_bgr, metric_text, pos,
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 4, cv2.LINE_AA)
+                    cv2.putText(frame_bgr, metric_text, pos,
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (122, 155, 118), 2, cv2.LINE_AA)
                 
-                cv2.putText(frame_bgr, metric_text, pos,
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 4, cv2.LINE_AA)
-                cv2.putText(frame_bgr, metric_text, pos,
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (122, 155, 118), 2, cv2.LINE_AA)
+                    # Display form feedback if available
+                    if pose_results.get('feedback'):
+                        y_offset = 150
+                        for feedback in pose_results['feedback']:
+                            cv2.putText(frame_bgr, feedback, (10, y_offset),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+                            cv2.putText(frame_bgr, feedback, (10, y_offset),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 150, 0), 1, cv2.LINE_AA)
+                            y_offset += 30
                 
-                # Display form feedback if available
-                if pose_results.get('feedback'):
-                    y_offset = 150
-                    for feedback in pose_results['feedback']:
-                        cv2.putText(frame_bgr, feedback, (10, y_offset),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
-                        cv2.putText(frame_bgr, feedback, (10, y_offset),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 150, 0), 1, cv2.LINE_AA)
-                        y_offset += 30
-                
-                # Test mode plotting (if enabled)
+                # Test mode samples are plotted on the Tk thread
                 if self.session.mode == True:
                     t = (datetime.now() - self.session.session_start).total_seconds()
-                    self.timestamps.append(t)
-                    self.raw_angles.append(raw_metric)
-                    self.filtered_angles.append(smoothed_metric)
-
-                    if len(self.timestamps) % 10 == 0:
-                        self.ax.clear()
-                        self.ax.set_facecolor('#fafafa')
-                        self.ax.grid(True, alpha=0.3, color=self.colors['text_secondary'])
-                        self.ax.spines['top'].set_visible(False)
-                        self.ax.spines['right'].set_visible(False)
-                        
-                        title = f"{self.analyzer.get_pose_name()} over Time"
-                        self.ax.set_title(title, fontsize=12, color=self.colors['text_primary'])
-                        self.ax.set_xlabel("Time (s)", color=self.colors['text_secondary'])
-                        self.ax.set_ylabel(f"Metric ({self.analyzer.get_metric_unit()})", 
-                                        color=self.colors['text_secondary'])
-                        
-                        self.ax.plot(self.timestamps, self.raw_angles, 
-                                label="Raw", alpha=0.4, color="#69411F", linewidth=2)
-                        self.ax.plot(self.timestamps, self.filtered_angles, 
-                                label="Filtered", color=self.colors['primary'], linewidth=2)
-                        
-                        self.ax.legend(frameon=False, loc='upper right')
-                        self.canvas.draw()
-
-        # Resize and display frame
-        frame_resized = self.resize_frame(frame_bgr)
-        img = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-        imgtk = ImageTk.PhotoImage(image=Image.fromarray(img))
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
+                    self.plot_samples.append((t, raw_metric, smoothed_metric))
+
+        elif self.landmark_filter is not None:
+            # Lost the person: start smoothing afresh when they reappear
+            self.landmark_filter.reset()
+
+        return item
+
+    def render_stage(self, item):
+        """Resize and convert to a PIL image ready for Tk"""
+        with timed(self.latency_stats, 'resize'):
+            frame_resized = self.resize_frame(item['image'])
+            img = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+        if self.latency_hud:
+            self.latency_stats.draw_hud(img)  # black and white, same in RGB
+        item['pil_image'] = Image.fromarray(img)
+        return item
+
+    def plot_fps(self):
+        # Samples arrive at the source's frame rate; assume a fast camera when it's unknown
+        return getattr(self.source, 'fps', None) or 60
+
+    def plot_labels(self):
+        return (f"{self.analyzer.get_pose_name()} over Time",
+                f"Metric ({self.analyzer.get_metric_unit()})")
+
+    def update_plot(self):
+        """Move new test-mode samples into the plot and redraw its lines"""
+        self.plot.set_labels(*self.plot_labels())
+        while self.plot_samples:
+            self.plot.append(*self.plot_samples.popleft())
+        self.plot.update()
+
+    def source_finished(self):
+        """Called once the whole source has been processed"""
+        recording = None
+        caching = None
+        if self.cache_hit:
+            result = self.active_estimator.result()
+            recording = (result['landmarks'], result['timestamps'], result['size'])
+        elif isinstance(self.active_estimator, CachingEstimator):
+            caching = self.active_estimator
+        if self.recorded_landmarks:
+            recording = (np.stack(self.recorded_landmarks), self.recorded_timestamps,
+                         self.recorded_size)
+            self.recorded_landmarks = self.recorded_timestamps = None
+        if recording is not None or caching is not None:
+            # Writing the cache and a Python loop over the whole video, keep both off the Tk thread
+            threading.Thread(target=self.finish_source, args=(self.source, caching, recording),
+                             daemon=True).start()
+
+    def finish_source(self, source, caching, recording):
+        """Worker thread: store the landmark cache, then re-score the recording"""
+        if caching is not None:
+            caching.finish(fps=getattr(source, 'fps', None))
+        if recording is not None:
+            self.offline_best(source, *recording)
+
+    def offline_best(self, source, landmarks, timestamps, size):
+        """
+        Re-score the finished video from its recorded landmarks, smoothed forwards
+        and backwards (RTS) so peaks are not lagged or blunted like the live
+        One Euro value, and offer the result to the session best.
+        """
+        smooth_recording(landmarks, getattr(source, 'fps', None), timestamps)
+        w, h = size
+        best = sequence_best(self.analyzer.analyze_sequence(landmarks, w, h))
+        with self.state_lock:
+            # Only if the video is still the one being shown
+            if best is not None and self.source is source:
+                self.session.offer_best(best)
+
+    def update_frame(self):
+        """Tk loop: show the newest finished frame, never waits on processing"""
+        if self.pipeline is None:
+            return
+
+        # Read finished before latest so the final frame is never missed
+        finished = self.pipeline.finished
+        item = self.pipeline.latest()
+
+        if self.pipeline.error is not None:
+            error, self.pipeline.error = self.pipeline.error, None
+            messagebox.showerror("Processing Error", str(error))
+            return
+
+        if item is not None:
+            with timed(self.latency_stats, 'display'):
+                imgtk = ImageTk.PhotoImage(image=item['pil_image'])
+                self.video_label.imgtk = imgtk
+                self.video_label.configure(image=imgtk)
+            if 'captured_at' in item:
+                self.latency_stats.record(END_TO_END, time.perf_counter() - item['captured_at'])
 
         if self.session.mode == True:
+            self.update_plot()
             self.test_mode()
+
+        if finished and item is None:
+            # End of video: stop loop (or switch back to camera if you prefer)
+            self.source_finished()
+            return
             
-        self.after(1, self.update_frame)
+        self.after(5, self.update_frame)
 
 
     def destroy(self):
-        if self.source: 
-            self.source.release()
-        super().destroy()
\ No newline at end of file
+        self.stop_pipeline()
+        super().destroy()
@@ -1,3 +1,165 @@
 """
 Embeds matplotlib graphs inside the GUI.
-"""
\ No newline at end of file
+Only the lines are blitted over a cached background, so an update costs the same
+at any point in a session; the background is redrawn only when the axes change.
+"""
+
+import numpy as np
+import tkinter as tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class RingBuffer:
+    """
+    Last `capacity` values in arrival order. Every value is written twice,
+    capacity apart, so the ordered contents are always one contiguous view.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.full(2 * capacity, np.nan)
+        self.count = 0
+
+    def append(self, value):
+        i = self.count % self.capacity
+        self.data[i] = self.data[i + self.capacity] = value
+        self.count += 1
+
+    def view(self):
+        """Read-only view, oldest first"""
+        if self.count < self.capacity:
+            return self.data[:self.count]
+        start = self.count % self.capacity
+        return self.data[start:start + self.capacity]
+
+    def clear(self):
+        self.count = 0
+
+
+class RollingPlot:
+    """
+    Usage:
+        plot = RollingPlot(parent, colors, "Front Split over Time", "Metric (°)")
+        plot.append(t, raw, filtered)   # any number of samples
+        plot.update()                   # once per display refresh
+
+    fps: sample rate, the buffers hold `window` seconds of it (see clear()).
+    """
+
+    def __init__(self, parent, colors, title, ylabel, window=30.0, fps=60):
+        self.colors = colors
+        self.window = window
+        self._allocate(fps)
+        self.dirty = False        # samples appended since the last update()
+        self.background = None    # cached axes without the lines
+
+        self.fig = Figure(figsize=(6, 4), dpi=100, facecolor=colors['surface'])
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor('#fafafa')
+        self.ax.grid(True, alpha=0.3, color=colors['text_secondary'])
+        self.ax.spines['top'].set_visible(False)
+        self.ax.spines['right'].set_visible(False)
+        self.ax.spines['left'].set_color(colors['text_secondary'])
+        self.ax.spines['bottom'].set_color(colors['text_secondary'])
+        self.set_labels(title, ylabel)
+
+        # animated=True keeps the lines out of full draws; they are only ever blitted
+        self.raw_line, = self.ax.plot([], [], label="Raw", alpha=0.4, color="#69411F",
+                                      linewidth=2, animated=True)
+        self.filtered_line, = self.ax.plot([], [], label="Filtered", color=colors['primary'],
+                                           linewidth=2, animated=True)
+        self.ax.legend(frameon=False, loc='upper right')
+        self.ax.set_xlim(0, window)
+        self.ax.set_ylim(0, 1)
+        self.ylim = None  # (low, high) of the data that set the current y range
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
+        # Every full draw (ours or a window resize) refreshes the cached background
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        widget = self.canvas.get_tk_widget()
+        widget.configure(bg=colors['surface'])
+        widget.pack(fill=tk.BOTH, expand=True)
+
+    def set_labels(self, title, ylabel):
+        """Title and y label; a change re-renders the background"""
+        if title == self.ax.get_title() and ylabel == self.ax.get_ylabel():
+            return
+        self.ax.set_title(title, fontsize=12, color=self.colors['text_primary'], pad=20)
+        self.ax.set_xlabel("Time (s)", color=self.colors['text_secondary'])
+        self.ax.set_ylabel(ylabel, color=self.colors['text_secondary'])
+        self.background = None
+        self.dirty = True
+
+    def append(self, t, raw, filtered):
+        self.times.append(t)
+        self.raw.append(np.nan if raw is None else raw)
+        self.filtered.append(np.nan if filtered is None else filtered)
+        self._fit(t, raw, filtered)
+        self.dirty = True
+
+    def _fit(self, t, *values):
+        """Move the axes limits if the sample falls outside them (invalidates the background)"""
+        x_low, x_high = self.ax.get_xlim()
+        if t > x_high or t < x_low:
+            # Jump ahead rather than scroll, so the background stays valid for half a window
+            start = max(0.0, t - 0.5 * self.window)
+            self.ax.set_xlim(start, start + self.window)
+            self.background = None
+
+        values = [v for v in values if v is not None and np.isfinite(v)]
+        if not values:
+            return
+        low, high = min(values), max(values)
+        if self.ylim is not None:
+            y_low, y_high = self.ax.get_ylim()
+            if low >= y_low and high <= y_high:
+                return
+            low, high = min(low, self.ylim[0]), max(high, self.ylim[1])
+        self.ylim = (low, high)
+        # Leave headroom so slow drifts don't re-render the axes on every sample
+        margin = max(5.0, 0.1 * (self.ylim[1] - self.ylim[0]))
+        self.ax.set_ylim(self.ylim[0] - margin, self.ylim[1] + margin)
+        self.background = None
+
+    def _allocate(self, fps):
+        capacity = int(np.ceil(self.window * fps)) + 1
+        self.times = RingBuffer(capacity)
+        self.raw = RingBuffer(capacity)
+        self.filtered = RingBuffer(capacity)
+
+    def clear(self, fps=None):
+        """Drop every sample; with fps, resize the buffers for the new sample rate"""
+        if fps is not None and int(np.ceil(self.window * fps)) + 1 != self.times.capacity:
+            self._allocate(fps)
+        self.times.clear()
+        self.raw.clear()
+        self.filtered.clear()
+        self.ylim = None
+        self.ax.set_xlim(0, self.window)
+        self.ax.set_ylim(0, 1)
+        self.background = None
+        self.dirty = True
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        times = self.times.view()
+        self.raw_line.set_data(times, self.raw.view())
+        self.filtered_line.set_data(times, self.filtered.view())
+        self.ax.draw_artist(self.raw_line)
+        self.ax.draw_artist(self.filtered_line)
+
+    def update(self):
+        """Redraw if there is anything new: a blit of the lines, or a full draw after an axes change"""
+        if not self.dirty:
+            return
+        self.dirty = False
+        if self.background is None:
+            self.canvas.draw()  # _on_draw caches the background and adds the lines
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_lines()
+        self.canvas.blit(self.ax.bbox)  # the lines never leave the axes
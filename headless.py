@@ -0,0 +1,251 @@
+"""
+Headless batch mode: process recorded videos or image folders without the GUI
+and write per-frame metrics plus the session best to disk.
+With --workers N videos are processed N at a time in a process pool.
+--record converts videos into memory-mapped recordings (.npy) that replay
+frame-exactly without decoding; those can be given as inputs like videos.
+"""
+
+# Imports
+import argparse
+import os
+import sys
+from core.pose_estimator import PoseEstimator
+from core.landmark_cache import LandmarkCache
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.session import PoseSession
+from core.sources import ImageFolderSource, SyntheticSource
+from core.recorder import record_source
+from core.synthetic import SyntheticPoseEstimator
+from core.batch import open_file, process_source, process_file, write_metrics_csv, write_merged_metrics_csv
+from core.hold_scanner import HoldScanner
+from core.scheduler import BatchScheduler
+
+
+def save_best(result, analyzer, progress_csv):
+    """Append the input's best value to the progress CSV, like the GUI's Save button"""
+    if result['best'] is None:
+        return
+    session = PoseSession(pose_name=analyzer.get_pose_name())
+    session.update_best(result['best'])
+    session.save_result(progress_csv)
+
+
+def output_name(path, used):
+    """Base name for an input's output files, numbered when two inputs share one"""
+    name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+    unique, n = name, 1
+    while unique in used:
+        n += 1
+        unique = f"{name}_{n}"
+    used.add(unique)
+    return unique
+
+
+def describe(path, result):
+    best = "no confident pose" if result['best'] is None else f"best {result['best']:.2f}"
+    return (f"{path}: {result['frames']} frames in {result['elapsed']:.1f}s "
+            f"({result['fps']:.1f} fps), {best}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flexibility Progress Tracker (headless)")
+    parser.add_argument("inputs", nargs="*",
+                        help="video files, recordings (.npy) and/or directories of images")
+    parser.add_argument("--pose", choices=["front_split", "forward_fold"], default="front_split",
+                        help="pose to analyze")
+    parser.add_argument("--output", default="data", metavar="DIR",
+                        help="directory for the per-frame metrics CSVs")
+    parser.add_argument("--progress", default="data/progress.csv", metavar="CSV",
+                        help="file the session best of each input is appended to")
+    parser.add_argument("--no-smooth", action="store_true",
+                        help="analyze raw landmarks instead of RTS-smoothed ones")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always run MediaPipe on video files instead of reusing cached landmarks")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="process videos in N worker processes (0 = one per core); "
+                             "merged results go to --output")
+    parser.add_argument("--split", action="store_true",
+                        help="with --workers, split each video into frame ranges processed in parallel "
+                             "(for a few long recordings rather than many short ones)")
+    parser.add_argument("--scan", action="store_true",
+                        help="find the pose holds with a quick low-rate pass first and only "
+                             "analyze those at full frame rate (videos and recordings only)")
+    parser.add_argument("--synthetic", type=int, default=None, metavar="FRAMES",
+                        help="load test: push FRAMES generated frames with synthetic landmarks "
+                             "through the pipeline (no MediaPipe) and report throughput")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="instead of analyzing, convert the videos into recordings in DIR")
+    parser.add_argument("--record-scale", type=float, default=1.0, metavar="SCALE",
+                        help="with --record, downscale the frames by SCALE")
+    args = parser.parse_args()
+
+    if args.synthetic is not None:
+        run_synthetic(args)
+        return
+    if not args.inputs:
+        parser.error("no inputs given")
+    if args.scan and args.workers != 1:
+        parser.error("--scan runs in a single process, it can't be combined with --workers")
+    if args.split and args.workers == 1:
+        parser.error("--split needs --workers")
+
+    if args.record:
+        run_record(args)
+        return
+    if args.workers != 1:
+        run_parallel(args)
+        return
+    if args.scan:
+        run_scan(args)
+        return
+
+    estimator = PoseEstimator()
+    image_estimator = None  # no tracking between unrelated images, made on first use
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(args.pose)
+    landmark_cache = None if args.no_cache else LandmarkCache()
+    os.makedirs(args.output, exist_ok=True)
+
+    total_frames = 0
+    total_time = 0.0
+    names = set()
+    try:
+        for path in args.inputs:
+            if os.path.isdir(path):
+                if image_estimator is None:
+                    image_estimator = PoseEstimator(static_image_mode=True)
+                source = ImageFolderSource(path)
+                try:
+                    result = process_source(source, image_estimator, analyzer,
+                                            smooth=not args.no_smooth)
+                finally:
+                    source.release()
+            else:
+                estimator.reset()  # the previous input's tracking state means nothing here
+                result = process_file(path, estimator, analyzer, landmark_cache,
+                                      smooth=not args.no_smooth)
+
+            name = output_name(path, names)
+            csv_path = os.path.join(args.output, f"{name}_{args.pose}.csv")
+            write_metrics_csv(csv_path, result)
+
+            save_best(result, analyzer, args.progress)
+
+            total_frames += result['frames']
+            total_time += result['elapsed']
+            print(f"{describe(path, result)} -> {csv_path}")
+    finally:
+        estimator.close()
+        if image_estimator is not None:
+            image_estimator.close()
+
+    if len(args.inputs) > 1 and total_time > 0:
+        print(f"Total: {total_frames} frames in {total_time:.1f}s ({total_frames / total_time:.1f} fps)")
+
+
+def run_parallel(args):
+    videos = [p for p in args.inputs if not os.path.isdir(p)]
+    if len(videos) < len(args.inputs):
+        print("--workers only handles video files, skipping image folders")
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(args.pose)
+
+    def progress(done, total, result):
+        name = result['path']
+        if 'chunk' in result:
+            name += f" (part {result['chunk'] + 1})"
+        if result['error']:
+            message = result['error'].strip().splitlines()[-1]
+            print(f"[{done}/{total}] {name}: FAILED ({message})")
+        elif 'chunk' in result:
+            print(f"[{done}/{total}] {name}: {result['frames']} frames in {result['elapsed']:.1f}s")
+        else:
+            print(f"[{done}/{total}] {describe(name, result)}")
+
+    scheduler = BatchScheduler(workers=args.workers or None, pose=args.pose,
+                               smooth=not args.no_smooth,
+                               cache_dir=None if args.no_cache else "data/landmark_cache")
+    if args.split:
+        results = scheduler.run_chunked(videos, output_dir=args.output, progress=progress)
+    else:
+        results = scheduler.run(videos, output_dir=args.output, progress=progress)
+    for result in results:
+        save_best(result, analyzer, args.progress)
+        if args.split and not result['error']:
+            print(describe(result['path'], result))
+
+    failed = sum(1 for r in results if r['error'])
+    print(f"Total: {scheduler.frames} frames from {len(results) - failed} videos in "
+          f"{scheduler.elapsed:.1f}s ({scheduler.fps:.1f} fps, {scheduler.workers} workers)"
+          + (f", {failed} failed" if failed else ""))
+
+
+def run_scan(args):
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(args.pose)
+    scanner = HoldScanner(analyzer, smooth=not args.no_smooth)
+    os.makedirs(args.output, exist_ok=True)
+    names = set()
+    try:
+        for path in args.inputs:
+            if os.path.isdir(path):
+                print(f"{path}: --scan only handles video files, skipped")
+                continue
+            scan = scanner.scan(path)
+            name = output_name(path, names)
+            csv_path = os.path.join(args.output, f"{name}_{args.pose}_holds.csv")
+            write_merged_metrics_csv(csv_path, scan['segments'])
+            save_best(scan, analyzer, args.progress)
+
+            best = "no confident pose" if scan['best'] is None else f"best {scan['best']:.2f}"
+            holds = ", ".join(f"{s['first_frame']}-{s['first_frame'] + s['frames']}"
+                              for s in scan['segments']) or "none"
+            print(f"{path}: holds at frames {holds}; {scan['coarse_frames']} sampled + "
+                  f"{scan['fine_frames']} full-rate of {scan['total_frames']} frames "
+                  f"in {scan['elapsed']:.1f}s, {best}")
+    finally:
+        scanner.coarse_estimator.close()
+        scanner.fine_estimator.close()
+
+
+def run_record(args):
+    names = set()
+    failed = 0
+    for path in args.inputs:
+        if os.path.isdir(path):
+            print(f"{path}: --record only handles video files, skipped")
+            continue
+        out = os.path.join(args.record, output_name(path, names))
+        try:
+            source = open_file(path)
+        except IOError as e:
+            print(f"{path}: FAILED ({e})")
+            failed += 1
+            continue
+        try:
+            frames = record_source(source, out, scale=args.record_scale,
+                                   name=os.path.basename(path))
+        finally:
+            source.release()
+        if frames == 0:
+            # Nothing was written, so there's no recording to point at
+            print(f"{path}: FAILED (no frames could be read)")
+            failed += 1
+            continue
+        print(f"{path}: {frames} frames -> {out}.npy")
+    if failed:
+        sys.exit(f"{failed} of the recordings failed")
+
+
+def run_synthetic(args):
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose(args.pose)
+    source = SyntheticSource(n_frames=args.synthetic, live=False)
+    estimator = SyntheticPoseEstimator(pose=args.pose, draw=False)  # nothing is displayed
+    result = process_source(source, estimator, analyzer, smooth=not args.no_smooth)
+    print(describe(f"synthetic {source.frames[0].shape[1]}x{source.frames[0].shape[0]}", result))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,19 @@ Main entry point for Flexibility Progress Tracker and Launches GUI
 """
 
 # Imports
-import cv2
-import tkinter as tk
+import argparse
+import os
+from datetime import datetime
 from core.pose_estimator import PoseEstimator
+from core.process_estimator import ProcessPoseEstimator
+from core.keyframe_estimator import KeyframeEstimator
+from core.quality_controller import AdaptiveQualityController
+from core.landmark_cache import LandmarkCache
+from core.motion_gate import MotionGatedEstimator
+from core.latency import LatencyStats
+from core.sources import CameraSource, SyntheticSource
+from core.recorder import FrameRecorder, RecordingSource
+from core.synthetic import SyntheticPoseEstimator
 from core.multi_pose_analyzer import MultiPoseAnalyzer
 # from core.pose_analyzer import PoseAnalyzer
 from core.session import PoseSession
@@ -13,15 +23,91 @@ from gui.app import GUIApp
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Flexibility Progress Tracker")
+    parser.add_argument("--estimator", choices=["inline", "process"], default="inline",
+                        help="run MediaPipe in the GUI process or in a separate worker process")
+    parser.add_argument("--roi-tracking", action="store_true",
+                        help="run MediaPipe on a box around the person instead of the whole frame")
+    parser.add_argument("--infer-every", type=int, default=1, metavar="N",
+                        help="run MediaPipe every N frames and predict landmarks in between")
+    parser.add_argument("--latency-budget", type=float, default=None, metavar="MS",
+                        help="run MediaPipe only when this per-frame budget (ms) allows")
+    parser.add_argument("--frame-budget", type=float, default=None, metavar="MS",
+                        help="adapt model complexity and input scale to hold this inference time (ms)")
+    parser.add_argument("--motion-gate", type=float, default=None, metavar="THRESHOLD",
+                        help="on the camera, reuse the last landmarks while the frame difference "
+                             "stays below THRESHOLD (0-255); counts go to --latency-export")
+    parser.add_argument("--smooth-landmarks", action="store_true",
+                        help="One Euro filter every landmark before analysis")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always run MediaPipe on video files instead of reusing cached landmarks")
+    parser.add_argument("--latency-hud", action="store_true",
+                        help="show rolling p50/p95/p99 per-stage latencies on the video")
+    parser.add_argument("--latency-export", default=None, metavar="JSON",
+                        help="write the per-stage latency percentiles to this file on exit")
+    parser.add_argument("--synthetic", type=float, default=None, metavar="FPS",
+                        help="load test: the camera option plays generated frames at FPS "
+                             "(0 = as fast as possible) with synthetic landmarks instead of MediaPipe")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="record each camera session to DIR for replay (open the .npy as a video)")
+    parser.add_argument("--record-scale", type=float, default=1.0, metavar="SCALE",
+                        help="downscale recorded frames by SCALE")
+    args = parser.parse_args()
+    if args.frame_budget is not None and (args.estimator == "process" or args.synthetic is not None):
+        parser.error("--frame-budget needs the inline estimator")
+
+    latency_stats = None
+    if args.latency_hud or args.latency_export:
+        latency_stats = LatencyStats()
+
+    analyser = MultiPoseAnalyzer()
+    camera_source = None
+
     # Core components
-    estimator = PoseEstimator()
-    analyser = MultiPoseAnalyzer() 
+    if args.synthetic is not None:
+        # Landmarks follow whichever pose is selected in the GUI
+        estimator = SyntheticPoseEstimator(pose=lambda: analyser.current_pose)
+        fps = args.synthetic
+        camera_source = lambda: SyntheticSource(fps=fps or 30, realtime=fps > 0)
+    elif args.estimator == "process":
+        estimator = ProcessPoseEstimator(roi_tracking=args.roi_tracking)
+    else:
+        estimator = PoseEstimator(roi_tracking=args.roi_tracking, latency_stats=latency_stats)
+        if args.frame_budget is not None:
+            estimator = AdaptiveQualityController(estimator, frame_budget=args.frame_budget / 1000.0)
+    if args.record:
+        open_camera = camera_source or (lambda: CameraSource(0, threaded=True))
+
+        def camera_source():
+            name = datetime.now().strftime("session_%Y%m%d_%H%M%S")
+            recorder = FrameRecorder(os.path.join(args.record, name), scale=args.record_scale,
+                                     source="camera")
+            return RecordingSource(open_camera(), recorder)
+    if args.infer_every > 1 or args.latency_budget is not None:
+        budget = args.latency_budget / 1000.0 if args.latency_budget is not None else None
+        estimator = KeyframeEstimator(estimator, every_n=args.infer_every, latency_budget=budget)
+    # Holds in front of a camera barely move; files are always inferred in full
+    live_estimator = None
+    if args.motion_gate is not None:
+        live_estimator = MotionGatedEstimator(estimator, threshold=args.motion_gate)
     session = PoseSession(pose_name="Front Split")  # Will be updated by GUI
     
+    landmark_cache = None if args.no_cache else LandmarkCache()
+    
     # GUI app
-    app = GUIApp(estimator, analyser, session)
-    app.mainloop()
+    app = GUIApp(estimator, analyser, session, landmark_cache,
+                 smooth_landmarks=args.smooth_landmarks,
+                 latency_stats=latency_stats, latency_hud=args.latency_hud,
+                 camera_source=camera_source, live_estimator=live_estimator)
+    try:
+        app.mainloop()
+    finally:
+        estimator.close()
+        if args.latency_export:
+            budget = args.frame_budget / 1000.0 if args.frame_budget is not None else 1 / 30
+            extra = {'motion_gate': live_estimator.stats()} if live_estimator else {}
+            latency_stats.export(args.latency_export, frame_budget=budget, **extra)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
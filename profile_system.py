@@ -2,24 +2,32 @@
 Profile the flexibility tracker system using cProfile
 """
 import cProfile
+import os
 import pstats
 from pstats import SortKey
-import sys
 
 # Your imports
 from core.pose_estimator import PoseEstimator
 from core.multi_pose_analyzer import MultiPoseAnalyzer
 from core.session import PoseSession
+from core.latency import LatencyStats
 from gui.app import GUIApp
 
+# Per-stage frame latencies; cProfile alone is dominated by Tk idle time
+latency_stats = LatencyStats()
+
 def run_profiled_app():
     """Run app with profiling enabled"""
-    estimator = PoseEstimator()
+    estimator = PoseEstimator(latency_stats=latency_stats)
     analyzer = MultiPoseAnalyzer() 
     session = PoseSession(pose_name="Front Split")
     
-    app = GUIApp(estimator, analyzer, session)
-    app.mainloop()
+    app = GUIApp(estimator, analyzer, session,
+                 latency_stats=latency_stats, latency_hud=True)
+    try:
+        app.mainloop()
+    finally:
+        estimator.close()
 
 if __name__ == "__main__":
     # Profile the application
@@ -48,4 +56,13 @@ if __name__ == "__main__":
     # Save to file
     stats.dump_stats('profiling_output.prof')
     print("\nDetailed results saved to: profiling_output.prof")
-    print("View with: python -m pstats profiling_output.prof")
\ No newline at end of file
+    print("View with: python -m pstats profiling_output.prof")
+
+    print("\nPer-stage latency (ms, last %d frames):" % latency_stats.window)
+    print(f"{'stage':<12}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'count':>8}")
+    for stage, s in latency_stats.summary().items():
+        print(f"{stage:<12}{s['p50']:8.1f}{s['p95']:8.1f}{s['p99']:8.1f}{s['max']:8.1f}{s['count']:8d}")
+    os.makedirs("data", exist_ok=True)
+    latency_path = os.path.join("data", "latency_output.json")
+    latency_stats.export(latency_path, frame_budget=1 / 30)
+    print(f"Latency percentiles saved to: {latency_path}")
\ No newline at end of file
@@ -0,0 +1,93 @@
+import numpy as np
+
+from core.synthetic import skeleton, depth_profile
+from core.batch import OFFLINE_PROCESS_VAR
+from filters.kalman2D import Kalman2D, KalmanBank, rts_smooth
+from filters.oneEuro import OneEuro, OneEuroBank, LANDMARK_MIN_CUTOFF, LANDMARK_BETA
+
+
+def noisy_landmarks(n=300, noise_px=1.5, seed=0):
+    clean = skeleton('front_split', depth_profile(n, 0.9))[:, :, :2].astype(np.float64)
+    rng = np.random.default_rng(seed)
+    return clean, clean + rng.normal(0, noise_px, clean.shape)
+
+
+def test_one_euro_bank_matches_scalar_filters():
+    _, z = noisy_landmarks(40)
+    bank = OneEuroBank(freq=30, min_cutoff=LANDMARK_MIN_CUTOFF, beta=LANDMARK_BETA)
+    scalars = [OneEuro(freq=30, min_cutoff=LANDMARK_MIN_CUTOFF, beta=LANDMARK_BETA)
+               for _ in range(z[0].size)]
+    for row in z:
+        expected = [f(x) for f, x in zip(scalars, row.ravel())]
+        np.testing.assert_allclose(bank(row).ravel(), expected, rtol=1e-9)
+
+
+def test_landmark_tuning_reduces_pixel_jitter():
+    clean, z = noisy_landmarks()
+    bank = OneEuroBank(freq=30, min_cutoff=LANDMARK_MIN_CUTOFF, beta=LANDMARK_BETA)
+    smoothed = np.stack([bank(row, i / 30) for i, row in enumerate(z)])
+    rms = lambda a: np.sqrt(((a - clean) ** 2).mean())
+    assert rms(smoothed) < 0.8 * rms(z)
+
+
+def test_kalman_bank_matches_kalman2d():
+    _, z = noisy_landmarks(30)
+    z[10, 5] = np.nan  # a missing point is predicted through
+    bank = KalmanBank(len(z[0]))
+    bank.initialize(z[0])
+    filters = []
+    for point in z[0]:
+        kf = Kalman2D()
+        kf.x[:2, 0] = point
+        filters.append(kf)
+    for row in z[1:]:
+        bank.predict()
+        out = bank.update(row)
+        for k, kf in enumerate(filters):
+            kf.predict()
+            expected = kf.x[:2].ravel() if np.isnan(row[k]).any() else kf.update(row[k])
+            np.testing.assert_allclose(out[k], expected, rtol=1e-9, atol=1e-9)
+
+
+def test_steady_state_gain_is_the_limit_of_the_full_filter():
+    full, steady = KalmanBank(1), KalmanBank(1, steady_state=True)
+    full.initialize(np.zeros((1, 2)))
+    for _ in range(3000):
+        full.predict()
+        P = full.P[0]
+        gain = P[:, :2] @ np.linalg.inv(P[:2, :2] + np.eye(2) * full.meas_var)
+        full.update(np.zeros((1, 2)))
+    np.testing.assert_allclose(gain, steady.gain, atol=1e-6)
+
+
+def test_one_euro_regular_timestamps_match_the_nominal_rate():
+    _, z = noisy_landmarks(20)
+    nominal, timed = OneEuroBank(freq=30), OneEuroBank(freq=30)
+    for i, row in enumerate(z):
+        np.testing.assert_allclose(timed(row, 5.0 + i / 30), nominal(row), rtol=1e-9)
+
+
+def test_kalman_predicts_across_the_real_gap():
+    bank = KalmanBank(1)
+    bank.initialize(np.zeros((1, 2)), t=0.0)
+    bank.x[0, 2:] = [30.0, -60.0]  # px/s
+    np.testing.assert_allclose(bank.predict(t=0.1), [[3.0, -6.0]])
+    np.testing.assert_allclose(bank.predict(), [[4.0, -8.0]])  # nominal 1/30 s
+
+
+def test_rts_smooth_beats_the_measurements_without_lag():
+    clean, z = noisy_landmarks()
+    smoothed = rts_smooth(z, process_var=OFFLINE_PROCESS_VAR)
+    assert smoothed.shape == z.shape
+    rms = lambda a: np.sqrt(((a - clean) ** 2).mean())
+    assert rms(smoothed) < 0.7 * rms(z)
+    # zero lag: no systematic offset along the motion
+    assert abs((smoothed - clean).mean()) < 0.1
+
+
+def test_rts_smooth_fills_gaps_but_not_ends():
+    z = np.arange(10, dtype=np.float64)
+    z[[0, 4, 5, 9]] = np.nan
+    out = rts_smooth(z, process_var=1.0, meas_var=1e-6)
+    assert np.isnan(out[[0, 9]]).all()
+    np.testing.assert_allclose(out[1:9], np.arange(1, 9), atol=1e-3)
@@ -0,0 +1,37 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from headless import output_name, run_record
+
+
+def test_output_names_are_unique_per_run():
+    names = set()
+    assert output_name("a/clip.mp4", names) == "clip"
+    assert output_name("b/clip.mp4", names) == "clip_2"
+    assert output_name("images/", names) == "images"
+    assert output_name("c/clip.npy", names) == "clip_3"
+
+
+def test_record_reports_unreadable_inputs(tmp_path, capsys):
+    good = str(tmp_path / "good.avi")
+    writer = cv2.VideoWriter(good, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+    junk = tmp_path / "junk.mp4"
+    junk.write_bytes(b"not a video")
+    out = tmp_path / "out"
+    args = argparse.Namespace(inputs=[good, str(tmp_path / "missing.mp4"), str(junk)],
+                              record=str(out), record_scale=1.0)
+
+    with pytest.raises(SystemExit) as exit:
+        run_record(args)
+    assert exit.value.code == "2 of the recordings failed"
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].endswith("5 frames -> " + str(out / "good") + ".npy")
+    assert "missing.mp4: FAILED" in lines[1] and "junk.mp4: FAILED" in lines[2]
+    assert sorted(os.listdir(out)) == ["good.json", "good.npy"]
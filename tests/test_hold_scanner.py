@@ -0,0 +1,38 @@
+import numpy as np
+
+from core.hold_scanner import HoldScanner
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.recorder import record_source
+from core.sources import SyntheticSource
+from core.synthetic import SyntheticPoseEstimator
+
+
+def scanner(**kwargs):
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose('front_split')
+    # One sweep into the split and back over the 10 s recording
+    make = lambda: SyntheticPoseEstimator('front_split', period=10.0, draw=False)
+    return HoldScanner(analyzer, coarse_estimator=make(), fine_estimator=make(), **kwargs)
+
+
+def test_intervals_join_short_gaps_and_drop_single_hits():
+    s = scanner(min_hits=2, max_gap=1)
+    samples = np.arange(0, 300, 15)
+    present = np.zeros(len(samples), dtype=bool)
+    present[[2, 3, 5, 6]] = True   # one gap of one sample: a single hold
+    present[12] = True             # a lone hit is noise
+    assert s.intervals(samples, present, 300, 15) == [(16, 105)]
+
+
+def test_scan_finds_the_hold_in_a_synthetic_recording(tmp_path):
+    source = SyntheticSource(width=160, height=120, n_frames=300, live=False)
+    record_source(source, str(tmp_path / "split"))
+    scan = scanner().scan(str(tmp_path / "split.npy"))
+
+    assert scan['total_frames'] == 300 and scan['coarse_frames'] == 20
+    [segment] = scan['segments']
+    start, stop = segment['first_frame'], segment['first_frame'] + segment['frames']
+    # the legs are more than 90 degrees apart from about 2.9 s to 7.1 s
+    assert 60 <= start <= 90 and 210 <= stop <= 240
+    assert scan['fine_frames'] < scan['total_frames']
+    assert scan['best'] is not None and scan['best'] == segment['best']
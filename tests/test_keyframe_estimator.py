@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+import core.keyframe_estimator as ke
+from core.keyframe_estimator import KeyframeEstimator
+from core.pose_estimator import array_to_results
+from core.synthetic import skeleton
+
+W, H = 64, 48
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEstimator:
+    """A standing skeleton sliding right `speed` px per frame; no pose on the frames in `lost`"""
+
+    def __init__(self, clock=None, cost=0.0, speed=1.0, lost=()):
+        self.rows = skeleton('front_split', [0.0], W, H)[0]
+        self.clock = clock
+        self.cost = cost
+        self.speed = speed
+        self.lost = set(lost)
+        self.calls = []
+
+    def position(self, i):
+        arr = self.rows.copy()
+        arr[:, 0] = (arr[:, 0] + self.speed * i) / W
+        arr[:, 1] /= H
+        return arr
+
+    def process_frame(self, frame, timestamp=None):
+        i = int(round(timestamp * 30))
+        self.calls.append(i)
+        if self.clock is not None:
+            self.clock.now += self.cost
+        return frame.copy(), array_to_results(None if i in self.lost else self.position(i))
+
+    def settings(self):
+        return {'model': 'fake'}
+
+    def close(self):
+        pass
+
+
+def run(keyframe, frames):
+    frame = np.zeros((H, W, 3), dtype=np.uint8)
+    return [keyframe.process_frame(frame, i / 30)[1] for i in range(frames)]
+
+
+def test_every_n_cadence():
+    estimator = FakeEstimator()
+    keyframe = KeyframeEstimator(estimator, every_n=3)
+    results = run(keyframe, 9)
+    assert estimator.calls == [0, 3, 6]
+    assert keyframe.keyframes == 3 and keyframe.predicted_frames == 6
+    assert [r.predicted for r in results] == [False, True, True] * 3
+    assert all(r.pose_landmarks is not None for r in results)
+
+
+def test_prediction_follows_motion():
+    estimator = FakeEstimator(speed=2.0)
+    keyframe = KeyframeEstimator(estimator, every_n=2)
+    results = run(keyframe, 21)
+    # Once the filters have picked up the velocity, the in-between frames
+    # land closer to the real skeleton than the last keyframe does
+    for i in (15, 17, 19):
+        assert results[i].predicted
+        x = results[i].landmark_array[:, 0] * W
+        truth = estimator.position(i)[:, 0] * W
+        stale = results[i - 1].landmark_array[:, 0] * W
+        assert (x > stale).all()
+        assert np.abs(x - truth).max() < 0.6 * np.abs(stale - truth).min()
+
+
+def test_lost_pose_resets():
+    estimator = FakeEstimator(lost={3})
+    keyframe = KeyframeEstimator(estimator, every_n=3)
+    results = run(keyframe, 5)
+    assert results[3].pose_landmarks is None and not results[3].predicted
+    assert keyframe.filters is not None
+    # Nothing to predict from after the loss, so frame 4 is inferred again
+    assert estimator.calls == [0, 3, 4]
+
+
+def test_lost_pose_clears_filters():
+    keyframe = KeyframeEstimator(FakeEstimator(lost={0}), every_n=3)
+    run(keyframe, 1)
+    assert keyframe.filters is None and keyframe.last is None
+
+
+def test_latency_budget(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ke.time, 'perf_counter', clock)
+    estimator = FakeEstimator(clock, cost=0.02)
+    keyframe = KeyframeEstimator(estimator, every_n=1, latency_budget=0.01)
+    run(keyframe, 20)
+    # Inference costs two frames' budget, so every other frame is predicted
+    # (every_n is ignored)
+    assert keyframe.infer_time == pytest.approx(0.02)
+    assert estimator.calls == list(range(0, 20, 2))
+    assert keyframe.predicted_frames == 10
+
+
+def test_latency_budget_covering_inference_runs_every_frame(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ke.time, 'perf_counter', clock)
+    estimator = FakeEstimator(clock, cost=0.005)
+    keyframe = KeyframeEstimator(estimator, every_n=4, latency_budget=0.01)
+    run(keyframe, 10)
+    assert estimator.calls == list(range(10))
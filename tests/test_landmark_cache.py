@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+
+import core.batch as batch
+from core.landmark_cache import LandmarkCache, CachingEstimator, file_identity
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.pose_estimator import array_to_results
+from core.synthetic import skeleton
+
+
+class FakeEstimator:
+    """Normalized synthetic landmarks, every third frame without a pose"""
+
+    def __init__(self, width=64, height=48):
+        self.rows = skeleton('front_split', np.linspace(0, 0.9, 12), width, height)
+        self.rows[:, :, 0] /= width
+        self.rows[:, :, 1] /= height
+        self.calls = 0
+
+    def process_frame(self, frame, timestamp=None):
+        i = self.calls
+        self.calls += 1
+        arr = None if i % 3 == 2 else self.rows[i % len(self.rows)]
+        return frame.copy(), array_to_results(arr)
+
+    def settings(self):
+        return {'model': 'fake'}
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "clip.bin"
+    path.write_bytes(os.urandom(3 << 20))
+    return str(path)
+
+
+def test_identity_sees_head_tail_and_size(video):
+    before = file_identity(video)
+    assert file_identity(video) == before
+    with open(video, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\x00' if f.read(1) != b'\x00' else b'\x01')
+    assert file_identity(video) != before
+
+
+def test_key_depends_on_settings(tmp_path, video):
+    cache = LandmarkCache(str(tmp_path / "cache"))
+    assert cache.key(video, {'a': 1}) != cache.key(video, {'a': 2})
+
+
+def test_store_load_evict(tmp_path):
+    cache = LandmarkCache(str(tmp_path / "cache"), max_bytes=10**9)
+    landmarks = np.random.rand(5, 33, 4).astype(np.float32)
+    cache.store("one", landmarks, {'frames': 5})
+    loaded, meta = cache.load("one")
+    np.testing.assert_array_equal(loaded, landmarks)
+    assert meta == {'frames': 5}
+    assert not [n for n in os.listdir(cache.directory) if n.endswith(".tmp")]
+
+    os.utime(cache._paths("one")[0], (0, 0))  # least recently used
+    cache.max_bytes = 1
+    cache.store("two", landmarks, {'frames': 5})
+    assert cache.load("one") is None
+
+
+def test_miss_then_hit(tmp_path, video):
+    cache = LandmarkCache(str(tmp_path / "cache"))
+    estimator = FakeEstimator()
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    miss = CachingEstimator(estimator, cache, video)
+    assert not miss.hit
+    for i in range(6):
+        miss.process_frame(frame, i / 30)
+    miss.finish(fps=30)
+
+    hit = CachingEstimator(estimator, cache, video)
+    assert hit.hit
+    result = hit.result()
+    assert result['frames'] == 6 and result['size'] == (64, 48)
+    assert result['timestamps'] == [i / 30 for i in range(6)]
+    np.testing.assert_allclose(result['landmarks'][0, :, 0], estimator.rows[0, :, 0] * 64, rtol=1e-5)
+    assert np.isnan(result['landmarks'][2]).all()
+
+    image, results = hit.replay(1, frame)
+    assert image.any() and results.landmark_array is not None
+    image, results = hit.replay(2, frame)
+    assert not image.any() and results.pose_landmarks is None
+    assert estimator.calls == 6  # nothing ran on the hit
+
+
+def test_process_file_hit_skips_the_source(tmp_path, video, monkeypatch):
+    cache = LandmarkCache(str(tmp_path / "cache"))
+    miss = CachingEstimator(FakeEstimator(), cache, video)
+    for i in range(12):
+        miss.process_frame(np.zeros((48, 64, 3), dtype=np.uint8), i / 30)
+    miss.finish(fps=30)
+
+    def no_decoding(path):
+        raise AssertionError("a cache hit opened the file")
+    monkeypatch.setattr(batch, 'file_source', no_decoding)
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose('front_split')
+    result = batch.process_file(video, FakeEstimator(), analyzer, cache)
+    assert result['frames'] == 12
+    assert len(result['metrics']['primary_metric']) == 12
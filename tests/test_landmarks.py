@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.landmarks import LandmarkFrame, NUM_LANDMARKS
+
+
+def mp_landmarks(arr):
+    return [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in arr]
+
+
+def normalized():
+    rng = np.random.default_rng(0)
+    return rng.random((NUM_LANDMARKS, 4)).astype(np.float32)
+
+
+def test_fill_converts_to_pixels():
+    arr = normalized()
+    frame = LandmarkFrame()
+    frame.fill(mp_landmarks(arr), 640, 480)
+    np.testing.assert_allclose(frame.data[:, 0], arr[:, 0] * 640, rtol=1e-6)
+    np.testing.assert_allclose(frame.data[:, 1], arr[:, 1] * 480, rtol=1e-6)
+    np.testing.assert_array_equal(frame.data[:, 2:], arr[:, 2:])
+    assert (frame.width, frame.height) == (640, 480)
+
+
+def test_fill_normalized_matches_fill_and_reuses_buffer():
+    arr = normalized()
+    a, b = LandmarkFrame(), LandmarkFrame()
+    buffer = b.data
+    a.fill(mp_landmarks(arr), 640, 480)
+    b.fill_normalized(arr, 640, 480)
+    np.testing.assert_allclose(a.data, b.data, rtol=1e-6)
+    assert b.data is buffer
+    assert arr[0, 0] <= 1  # the input is not scaled in place
+
+
+def test_fill_from_results():
+    arr = normalized()
+    frame = LandmarkFrame()
+    assert not frame.fill_from_results(SimpleNamespace(pose_landmarks=None), 640, 480)
+    results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=mp_landmarks(arr)))
+    assert frame.fill_from_results(results, 640, 480)
+    np.testing.assert_allclose(frame.xy(23), arr[23, :2] * (640, 480), rtol=1e-6)
+    np.testing.assert_array_equal(frame.visibility, arr[:, 3])
+
+
+def test_xy_is_a_view():
+    frame = LandmarkFrame()
+    frame.xy(0)[:] = (5, 6)
+    assert tuple(frame.data[0, :2]) == (5, 6)
@@ -0,0 +1,33 @@
+import json
+
+import numpy as np
+
+from core.latency import LatencyStats, timed
+
+
+def test_percentiles_cover_the_last_window_only():
+    stats = LatencyStats(window=100)
+    for ms in range(1000, 1100):   # pushed out of the window below
+        stats.record('inference', ms / 1000.0)
+    for ms in range(1, 101):
+        stats.record('inference', ms / 1000.0)
+    s = stats.summary()['inference']
+    assert s['count'] == 200
+    np.testing.assert_allclose([s['p50'], s['p95'], s['p99']],
+                               np.percentile(np.arange(1, 101), [50, 95, 99]))
+    assert s['max'] == 100
+
+
+def test_timed_and_export(tmp_path):
+    stats = LatencyStats()
+    with timed(stats, 'analysis'):
+        pass
+    with timed(None, 'ignored'):
+        pass
+    stats.record('inference', 0.05)
+    path = tmp_path / "latency.json"
+    stats.export(str(path), frame_budget=1 / 30, motion_gate={'inferences_saved': 3})
+    data = json.loads(path.read_text())
+    assert list(data['stages']) == ['analysis', 'inference']
+    assert data['over_budget'] == ['inference']
+    assert data['motion_gate'] == {'inferences_saved': 3}
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from core.motion_gate import MotionGatedEstimator
+from core.pose_estimator import array_to_results
+from core.synthetic import skeleton
+
+W, H = 64, 48
+
+
+class FakeEstimator:
+    """Returns the same normalized skeleton every call (or no pose) and counts calls"""
+
+    def __init__(self, pose=True):
+        rows = skeleton('front_split', [0.5], W, H)[0]
+        rows[:, 0] /= W
+        rows[:, 1] /= H
+        self.rows = rows if pose else None
+        self.calls = 0
+
+    def process_frame(self, frame, timestamp=None):
+        self.calls += 1
+        return frame.copy(), array_to_results(self.rows)
+
+    def settings(self):
+        return {'model': 'fake'}
+
+    def close(self):
+        pass
+
+
+def frame(level):
+    return np.full((H, W, 3), level, dtype=np.uint8)
+
+
+def levels(gate, values):
+    return [gate.process_frame(frame(v))[1] for v in values]
+
+
+def test_still_frames_reuse_the_last_result():
+    estimator = FakeEstimator()
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=100)
+    results = levels(gate, [100, 101, 100, 101, 100])
+    assert estimator.calls == 1
+    assert all(r is results[0] for r in results)
+    assert gate.motion_score == pytest.approx(0.0)
+
+
+def test_still_frames_reinfer_every_n():
+    estimator = FakeEstimator()
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=4)
+    levels(gate, [100] * 12)
+    assert estimator.calls == 3  # frames 0, 4 and 8
+
+
+def test_motion_always_reinfers():
+    estimator = FakeEstimator()
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=100)
+    levels(gate, [100, 110, 120, 130, 140])
+    assert estimator.calls == 5
+    assert gate.motion_score == pytest.approx(10.0)
+
+
+def test_motion_is_measured_against_the_last_inferred_frame():
+    # Slow drift: each step is under the threshold, but it adds up
+    estimator = FakeEstimator()
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=100)
+    levels(gate, [100, 101, 102, 103])
+    assert estimator.calls == 2  # frames 0 and 2
+
+
+def test_no_pose_is_never_reused():
+    estimator = FakeEstimator(pose=False)
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=100)
+    levels(gate, [100] * 5)
+    assert estimator.calls == 5
+
+
+def test_counters():
+    estimator = FakeEstimator()
+    gate = MotionGatedEstimator(estimator, threshold=2.0, reinfer_every=5)
+    levels(gate, [100] * 10 + [150] + [150] * 4)
+    stats = gate.stats()
+    assert stats['inferences_run'] == estimator.calls == 3  # frames 0, 5 and 10
+    assert stats['inferences_saved'] == 12
+    assert stats['saved_fraction'] == pytest.approx(12 / 15)
+    assert gate.settings() == {'model': 'fake', 'motion_threshold': 2.0, 'reinfer_every': 5}
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from core.landmarks import LandmarkFrame
+from core.multi_pose_analyzer import (PoseAnalyzer, MultiPoseAnalyzer, HIP_CENTER,
+                                      SHOULDER_CENTER, KNEE_CENTER, WRIST_CENTER, HIP_VERTICAL)
+from core.synthetic import skeleton
+
+angle = PoseAnalyzer.calculate_angle
+
+
+def frame_of(data):
+    frame = LandmarkFrame()
+    frame.data[:] = data
+    return frame
+
+
+def test_calculate_angles_matches_scalar_version():
+    rng = np.random.default_rng(0)
+    a, b, c = rng.normal(size=(3, 200, 2)) * 100
+    expected = [angle(a[i], b[i], c[i]) for i in range(200)]
+    np.testing.assert_allclose(PoseAnalyzer.calculate_angles(a, b, c), expected, atol=1e-9)
+
+
+def test_keypoints_centers():
+    data = skeleton('front_split', [0.5])[0]
+    K = PoseAnalyzer.keypoints(data)
+    np.testing.assert_allclose(K[:33], data[:, :2])
+    np.testing.assert_allclose(K[HIP_CENTER], (data[23, :2] + data[24, :2]) / 2, rtol=1e-6)
+    np.testing.assert_allclose(K[SHOULDER_CENTER], (data[11, :2] + data[12, :2]) / 2, rtol=1e-6)
+    np.testing.assert_allclose(K[KNEE_CENTER], (data[25, :2] + data[26, :2]) / 2, rtol=1e-6)
+    np.testing.assert_allclose(K[WRIST_CENTER], (data[15, :2] + data[16, :2]) / 2, rtol=1e-6)
+    assert K[HIP_VERTICAL, 0] == pytest.approx(K[HIP_CENTER, 0]) and K[HIP_VERTICAL, 1] == 0
+
+
+@pytest.mark.parametrize('depth', [0.2, 0.6, 0.95])
+def test_front_split_angles_match_scalar_geometry(depth):
+    data = skeleton('front_split', [depth])[0]
+    P = data[:, :2].astype(np.float64)
+    hip, shoulder = (P[23] + P[24]) / 2, (P[11] + P[12]) / 2
+    front, back = ((23, 25, 27), (24, 26, 28)) if P[25, 1] > P[26, 1] else ((24, 26, 28), (23, 25, 27))
+
+    results = MultiPoseAnalyzer().analyze(frame_of(data), 640, 480)
+    assert results['hip_opening_angle'] == pytest.approx(angle(P[front[2]], hip, P[back[2]]), abs=1e-3)
+    assert results['hip_flexor_angle'] == pytest.approx(angle(P[front[2]], P[front[0]], shoulder), abs=1e-3)
+    assert results['front_knee_angle'] == pytest.approx(angle(*P[list(front)]), abs=1e-3)
+    assert results['back_knee_angle'] == pytest.approx(angle(*P[list(back)]), abs=1e-3)
+
+
+def test_forward_fold_angles_match_scalar_geometry():
+    data = skeleton('forward_fold', [0.7])[0]
+    P = data[:, :2].astype(np.float64)
+    hip, shoulder, knee = (P[23] + P[24]) / 2, (P[11] + P[12]) / 2, (P[25] + P[26]) / 2
+
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose('forward_fold')
+    results = analyzer.analyze(frame_of(data), 640, 480)
+    assert results['hip_flexion'] == pytest.approx(angle(shoulder, hip, knee), abs=1e-3)
+    assert results['torso_angle'] == pytest.approx(angle((hip[0], 0), hip, shoulder), abs=1e-3)
+
+
+def test_unknown_pose_rejected():
+    with pytest.raises(ValueError):
+        MultiPoseAnalyzer().set_pose('splits')
+
+
+def recording(pose, n=40, dropped=(3, 17)):
+    from core.synthetic import depth_profile
+    data = skeleton(pose, depth_profile(n))
+    data[list(dropped)] = np.nan
+    return data
+
+
+@pytest.mark.parametrize('pose', ['front_split', 'forward_fold'])
+def test_analyze_sequence_matches_frame_by_frame(pose):
+    data = recording(pose)
+    live = MultiPoseAnalyzer()
+    live.set_pose(pose)
+    metrics = MultiPoseAnalyzer().analyze_sequence(data, 640, 480, pose_name=pose)
+    assert len(metrics['primary_metric']) == len(data)
+    for t, row in enumerate(data):
+        if np.isnan(row[0, 0]):
+            assert np.isnan(metrics['primary_metric'][t])
+            continue
+        expected = live.analyze(frame_of(row), 640, 480)
+        assert metrics['primary_metric'][t] == pytest.approx(expected['primary_metric'], abs=1e-3)
+        assert metrics['confidence'][t] == pytest.approx(expected['confidence'])
+
+
+def test_analyze_sequence_ignores_live_calibration():
+    data = recording('front_split')
+    fresh = MultiPoseAnalyzer().analyze_sequence(data, 640, 480)
+    used = MultiPoseAnalyzer()
+    other = skeleton('front_split', [0.0], body=0.4)[0]  # a much smaller person calibrates differently
+    used.analyze(frame_of(other), 640, 480)
+    np.testing.assert_array_equal(used.analyze_sequence(data, 640, 480)['primary_metric'],
+                                  fresh['primary_metric'])
+
+
+def test_analyze_sequence_options():
+    data = recording('front_split')
+    analyzer = MultiPoseAnalyzer()
+    tall = analyzer.analyze_sequence(data, 640, 480, assumed_height_cm=180)
+    short = analyzer.analyze_sequence(data, 640, 480, assumed_height_cm=120)
+    assert np.nanmean(tall['hip_to_floor_cm']) > np.nanmean(short['hip_to_floor_cm'])
+    fixed = analyzer.analyze_sequence(data, 640, 480, calibration_factor=0.5)
+    np.testing.assert_allclose(fixed['hip_to_floor_cm'], fixed['hip_to_floor_px'] * 0.5)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import numpy as np
+
+from core.pipeline import Pipeline, same_frame
+from core.sources import FrameSource
+
+
+class ListSource(FrameSource):
+    def __init__(self, frames, block=None):
+        self.frames = list(frames)
+        self.block = block
+        self.released = False
+
+    def read(self):
+        if self.block is not None:
+            self.block.wait()
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+    def release(self):
+        self.released = True
+
+
+def frames(n):
+    return [np.full((2, 2, 3), i, dtype=np.uint8) for i in range(n)]
+
+
+def run(pipeline, timeout=5.0):
+    pipeline.start()
+    deadline = time.monotonic() + timeout
+    while not pipeline.finished and time.monotonic() < deadline:
+        time.sleep(0.005)
+    pipeline.stop()
+    assert pipeline.finished
+
+
+def test_every_frame_in_order_without_dropping():
+    seen = []
+    stages = [lambda item: item, lambda item: seen.append(int(item['frame'][0, 0, 0])) or item]
+    pipeline = Pipeline(ListSource(frames(50)), stages, drop_frames=False)
+    run(pipeline)
+    assert seen == list(range(50))
+    assert pipeline.dropped == 0
+
+
+def test_dropped_frames_are_counted():
+    seen = []
+
+    def slow(item):
+        time.sleep(0.002)
+        seen.append(item['index'])
+        return item
+
+    pipeline = Pipeline(ListSource(frames(200)), [lambda item: item, slow], drop_frames=True)
+    run(pipeline)
+    assert len(seen) + pipeline.dropped == 200
+
+
+def test_stage_error_is_reported():
+    def broken(item):
+        raise ValueError("boom")
+
+    pipeline = Pipeline(ListSource(frames(5)), [broken])
+    pipeline.start()
+    deadline = time.monotonic() + 5.0
+    while pipeline.error is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+    pipeline.stop()
+    assert isinstance(pipeline.error, ValueError)
+
+
+def test_stop_defers_release_while_capture_is_reading():
+    block = threading.Event()
+    source = ListSource(frames(1), block=block)
+    pipeline = Pipeline(source, [lambda item: item])
+    pipeline.start()
+    capture = pipeline.threads[0]
+    pipeline.stop(release_source=True)
+    assert capture.is_alive() and not source.released
+    block.set()
+    capture.join(timeout=2.0)
+    assert source.released
+
+
+def test_stop_releases_idle_source():
+    source = ListSource(frames(3))
+    pipeline = Pipeline(source, [lambda item: item], drop_frames=False)
+    run(pipeline)
+    pipeline.stop(release_source=True)
+    assert source.released
+
+
+def test_same_frame_ignores_sensor_noise_but_not_motion():
+    rng = np.random.default_rng(0)
+    scene = rng.integers(40, 200, (480, 640, 3)).astype(np.uint8)
+    noisy = np.clip(scene + rng.normal(0, 3, scene.shape), 0, 255).astype(np.uint8)
+    assert same_frame(scene, noisy)
+    moved = noisy.copy()
+    moved[200:260, 300:340] = 255 - moved[200:260, 300:340]  # a hand-sized change
+    assert not same_frame(scene, moved)
+    assert not same_frame(scene, scene[:240])
+
+
+def test_unchanged_frames_are_skipped():
+    seen = []
+    source = ListSource([np.full((2, 2, 3), v, dtype=np.uint8) for v in (0, 3, 50, 50, 0)])
+    run(Pipeline(source, [lambda item: seen.append(item['frame'][0, 0, 0])],
+                 drop_frames=False, skip_duplicates=True))
+    assert seen == [0, 50, 0]
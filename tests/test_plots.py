@@ -0,0 +1,24 @@
+import numpy as np
+
+from gui.plots import RingBuffer
+
+
+def test_ring_buffer_keeps_the_last_capacity_values_in_order():
+    buf = RingBuffer(4)
+    assert len(buf.view()) == 0
+    for v in range(3):
+        buf.append(v)
+    np.testing.assert_array_equal(buf.view(), [0, 1, 2])
+    for v in range(3, 10):
+        buf.append(v)
+        np.testing.assert_array_equal(buf.view(), np.arange(v - 3, v + 1))
+    assert buf.view().base is buf.data  # a view, never a copy
+
+
+def test_ring_buffer_clear():
+    buf = RingBuffer(3)
+    for v in range(5):
+        buf.append(v)
+    buf.clear()
+    buf.append(7)
+    np.testing.assert_array_equal(buf.view(), [7])
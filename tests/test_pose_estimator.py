@@ -0,0 +1,92 @@
+import numpy as np
+import mediapipe as mp
+
+from core.landmarks import LandmarkFrame
+from core.pose_estimator import array_to_results, draw_skeleton, landmarks_to_array
+from core.process_estimator import ProcessPoseEstimator
+from core.synthetic import skeleton
+
+
+def pose_array(width=640, height=480):
+    arr = skeleton('front_split', [0.6], width, height)[0]
+    arr[:, 0] /= width
+    arr[:, 1] /= height
+    arr[5, 3] = 0.2  # one landmark below the drawing threshold
+    return arr
+
+
+def test_array_results_build_landmarks_lazily():
+    arr = pose_array()
+    results = array_to_results(arr)
+    assert results._pose_landmarks is None
+    frame = LandmarkFrame()
+    assert frame.fill_from_results(results, 640, 480)
+    assert results._pose_landmarks is None  # filling from the array needs no protobuf
+    np.testing.assert_allclose(landmarks_to_array(results.pose_landmarks), arr, atol=1e-6)
+    assert not frame.fill_from_results(array_to_results(None), 640, 480)
+
+
+def test_draw_skeleton_matches_mediapipe_drawing():
+    arr = pose_array()
+    expected = np.zeros((480, 640, 3), dtype=np.uint8)
+    mp.solutions.drawing_utils.draw_landmarks(
+        expected, array_to_results(arr).pose_landmarks, mp.solutions.pose.POSE_CONNECTIONS)
+    image = np.zeros_like(expected)
+    draw_skeleton(image, arr)
+    assert np.array_equal(image, expected)
+
+
+def test_draw_skeleton_ignores_missing_landmarks():
+    image = np.zeros((48, 64, 3), dtype=np.uint8)
+    draw_skeleton(image, np.full((33, 4), np.nan, dtype=np.float32))
+    assert not image.any()
+
+
+def test_process_estimator_keeps_worker_across_frame_sizes():
+    estimator = ProcessPoseEstimator()
+    try:
+        image, results = estimator.process_frame(np.zeros((120, 160, 3), dtype=np.uint8))
+        assert image.shape == (120, 160, 3)
+        assert results.landmark_array is None
+        pid = estimator.proc.pid
+        image, results = estimator.process_frame(np.zeros((240, 320, 3), dtype=np.uint8))
+        image, results = estimator.process_frame(np.zeros((60, 80, 3), dtype=np.uint8))
+        assert image.shape == (60, 80, 3)
+        assert estimator.proc.pid == pid
+        assert estimator.shm.size == 240 * 320 * 3
+    finally:
+        estimator.close()
+
+
+class CountingPose:
+    def __init__(self):
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+
+
+def results_at(dx=0.0):
+    arr = pose_array()
+    arr[:, 0] += dx
+    return array_to_results(arr)
+
+
+def test_roi_holds_still_and_resets_crop_graph_only_when_moved():
+    from core.pose_estimator import PoseEstimator
+    estimator = PoseEstimator(roi_tracking=True)
+    try:
+        estimator.roi_pose.close()
+        estimator.roi_pose = CountingPose()
+        estimator._update_roi(results_at(), 640, 480)
+        roi = estimator.roi
+        assert roi is not None and estimator.roi_pose.resets == 1
+        estimator._update_roi(results_at(0.002), 640, 480)  # a pixel or so of motion
+        assert estimator.roi == roi and estimator.roi_pose.resets == 1
+        estimator._update_roi(results_at(0.2), 640, 480)    # walked off to the side
+        assert estimator.roi != roi and estimator.roi_pose.resets == 2
+        estimator._update_roi(array_to_results(None), 640, 480)
+        assert estimator.roi is None
+    finally:
+        estimator.roi_pose = None
+        estimator.close()
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import core.quality_controller as qc
+from core.quality_controller import AdaptiveQualityController, QUALITY_LEVELS
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeEstimator:
+    """Costs `cost[(complexity, scale)]` seconds per detect, more right after a reset"""
+
+    def __init__(self, clock, cost, detect_factor=3.0):
+        self.clock = clock
+        self.cost = cost
+        self.detect_factor = detect_factor
+        self.model_complexity, self.input_scale = 1, 1.0
+        self.tracking = False
+        self.resets = 0
+
+    def set_quality(self, model_complexity, input_scale):
+        self.model_complexity, self.input_scale = model_complexity, input_scale
+        self.tracking = False
+
+    def reset(self):
+        self.resets += 1
+        self.tracking = False
+
+    def detect(self, frame):
+        cost = self.cost[(self.model_complexity, self.input_scale)]
+        self.clock.now += cost if self.tracking else cost * self.detect_factor
+        self.tracking = True
+
+    def process_frame(self, frame, timestamp=None):
+        self.detect(frame)
+        return frame, None
+
+    def settings(self):
+        return {'model_complexity': self.model_complexity, 'input_scale': self.input_scale}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(qc.time, 'perf_counter', clock)
+    return clock
+
+
+def costs(per_level):
+    return dict(zip(QUALITY_LEVELS, per_level))
+
+
+def test_default_levels_never_load_the_heavy_model():
+    assert max(c for c, _ in QUALITY_LEVELS) == 1
+
+
+def test_benchmark_measures_full_detection_cost(clock):
+    # Tracking alone would fit 1.0 at complexity 1, full detection does not
+    estimator = FakeEstimator(clock, costs([0.002, 0.003, 0.004, 0.009, 0.010]), detect_factor=3.0)
+    controller = AdaptiveQualityController(estimator, frame_budget=1 / 30, auto_benchmark=False)
+    assert controller.benchmark(np.zeros((4, 4, 3))) == (0, 1.0)
+    assert estimator.resets > 0
+
+
+def test_steps_down_when_over_budget(clock):
+    estimator = FakeEstimator(clock, costs([0.01] * 4 + [0.05]), detect_factor=1.0)
+    controller = AdaptiveQualityController(estimator, frame_budget=1 / 30, window=5, cooldown=5,
+                                           auto_benchmark=False)
+    assert controller.quality == (1, 1.0)
+    for _ in range(5):
+        controller.process_frame(None)
+    assert controller.quality == (1, 0.75)
+    # The cheaper level fits easily, so it tries the top again after the cooldown...
+    for _ in range(5):
+        controller.process_frame(None)
+    assert controller.quality == (1, 1.0)
+    # ...which doesn't fit: back down, and the next upgrade waits twice as long
+    for _ in range(5):
+        controller.process_frame(None)
+    assert controller.quality == (1, 0.75) and controller.upgrade_backoff == 2
+
+
+def test_settings_do_not_follow_the_quality(clock):
+    controller = AdaptiveQualityController(FakeEstimator(clock, costs([0.001] * 5)),
+                                           auto_benchmark=False)
+    before = controller.settings()
+    controller._apply(0)
+    assert controller.settings() == before
+    assert 'model_complexity' not in before
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from core.batch import process_range
+from core.pose_estimator import array_to_results
+from core.recorder import FrameRecorder, npy_header, HEADER_SIZE
+from core.sources import MmapFrameSource, SyntheticSource, file_source
+
+
+def record(path, n=10, scale=1.0):
+    source = SyntheticSource(width=32, height=24, n_frames=n, live=False)
+    recorder = FrameRecorder(str(path), scale=scale, source="synthetic")
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame.copy())
+        recorder.write(frame, 100 + source.last_timestamp)
+    recorder.close()
+    return frames
+
+
+def test_header_is_fixed_size_and_valid(tmp_path):
+    header = npy_header(np.uint8, (7, 4, 5, 3))
+    assert len(header) == HEADER_SIZE
+    path = tmp_path / "x.npy"
+    path.write_bytes(header + bytes(7 * 4 * 5 * 3))
+    assert np.load(path).shape == (7, 4, 5, 3)
+
+
+def test_recording_replays_frame_exact(tmp_path):
+    frames = record(tmp_path / "session")
+    assert not list(tmp_path.glob("*.tmp"))
+    meta = json.loads((tmp_path / "session.json").read_text())
+    assert meta['frames'] == 10 and meta['fps'] == pytest.approx(30) and meta['timestamps'][0] == 0
+
+    source = file_source(str(tmp_path / "session.npy"))
+    assert isinstance(source, MmapFrameSource)
+    replayed, timestamps = [], []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        replayed.append(frame)
+        timestamps.append(source.last_timestamp)
+    np.testing.assert_array_equal(np.stack(replayed), np.stack(frames))
+    np.testing.assert_allclose(timestamps, np.arange(10) / 30)
+
+
+def test_downscaled_recording(tmp_path):
+    record(tmp_path / "small", n=3, scale=0.5)
+    assert MmapFrameSource(str(tmp_path / "small")).frames.shape == (3, 12, 16, 3)
+
+
+def test_ranges_of_a_recording(tmp_path):
+    frames = record(tmp_path / "session")
+    seen = []
+
+    class Estimator:
+        def process_frame(self, frame, timestamp=None):
+            seen.append(timestamp)
+            return frame, array_to_results(None)
+
+    result = process_range(str(tmp_path / "session.npy"), Estimator(), 4, 8, warmup=2)
+    assert result['frames'] == 4 and result['first_frame'] == 4
+    np.testing.assert_allclose(seen, np.arange(2, 8) / 30)
+    np.testing.assert_allclose(result['timestamps'], np.arange(4, 8) / 30)
+
+    source = file_source(str(tmp_path / "session.npy"), 3)
+    assert source.grab() and source.read()[1] is not None
+    np.testing.assert_array_equal(source.frames[4], frames[4])
@@ -0,0 +1,80 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from core.batch import process_range
+from core.multi_pose_analyzer import MultiPoseAnalyzer
+from core.pose_estimator import array_to_results
+from core.scheduler import BatchScheduler, _file_failed
+from core.synthetic import skeleton
+
+
+class BrightnessEstimator:
+    """Landmarks whose x encodes the frame's brightness, i.e. which frame it was"""
+
+    def __init__(self):
+        self.row = skeleton('front_split', [0.8], 64, 48)[0]
+        self.row[:, 1] /= 48
+
+    def reset(self):
+        pass
+
+    def process_frame(self, frame, timestamp=None):
+        arr = self.row.copy()
+        arr[:, 0] = frame.mean() / 255
+        return frame, array_to_results(arr)
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for i in range(40):
+        writer.write(np.full((48, 64, 3), 6 * i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def frame_numbers(result):
+    return np.round(result['landmarks'][:, 0, 0] * 255 / 64 / 6).astype(int).tolist()
+
+
+def crash(job):
+    os._exit(1)  # like a segfault: no exception, the worker is just gone
+
+
+def test_dead_worker_fails_its_jobs_instead_of_hanging():
+    scheduler = BatchScheduler(workers=1, cache_dir=None)
+    jobs = [(0, "a.mp4"), (1, "b.mp4")]
+    results = list(scheduler._map(crash, jobs, None, _file_failed))
+    assert sorted(r['index'] for r in results) == [0, 1]
+    assert all('BrokenProcessPool' in r['error'] for r in results)
+
+
+def test_ranges_start_on_the_right_frame(video):
+    result = process_range(video, BrightnessEstimator(), 17, 25, warmup=5)
+    assert frame_numbers(result) == list(range(17, 25))
+    assert result['first_frame'] == 17 and result['source_fps'] == 30
+
+
+def test_stitched_chunks_equal_the_whole_video(video):
+    estimator = BrightnessEstimator()
+    chunks = []
+    for chunk, (start, stop) in enumerate([(0, 13), (13, 26), (26, None)]):
+        result = process_range(video, estimator, start, stop, warmup=5)
+        result.update(chunk=chunk, error=None)
+        chunks.append(result)
+    analyzer = MultiPoseAnalyzer()
+    analyzer.set_pose('front_split')
+    scheduler = BatchScheduler(workers=3, cache_dir=None, smooth=False)
+
+    stitched = scheduler._stitch(0, video, chunks[::-1], analyzer)
+    assert stitched['error'] is None and stitched['frames'] == 40
+    assert frame_numbers(stitched) == list(range(40))
+    assert len(stitched['metrics']['primary_metric']) == 40
+
+    chunks[1] = dict(chunks[1], error="Traceback: boom")
+    failed = scheduler._stitch(0, video, chunks, analyzer)
+    assert failed['error'] == "Traceback: boom" and failed['frames'] == 0
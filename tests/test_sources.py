@@ -0,0 +1,88 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import core.sources as sources
+from core.sources import CameraSource
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in: fails the first `failures` reads, then returns frames"""
+
+    def __init__(self, device=0, failures=0, block=None):
+        self.failures = failures
+        self.block = block
+        self.reads = 0
+        self.released = False
+
+    def set(self, prop, value):
+        return True
+
+    def read(self):
+        self.reads += 1
+        if self.block is not None:
+            self.block.wait()
+        if self.reads <= self.failures:
+            return False, None
+        return True, np.full((4, 4, 3), self.reads % 256, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def fake_capture(monkeypatch):
+    def install(**kwargs):
+        monkeypatch.setattr(sources.cv2, 'VideoCapture', lambda device: FakeCapture(device, **kwargs))
+    monkeypatch.setattr(CameraSource, 'RETRY_DELAY', 0.001)
+    return install
+
+
+def test_camera_survives_transient_failures(fake_capture):
+    fake_capture(failures=3)
+    source = CameraSource(threaded=True, max_failures=5)
+    try:
+        ret, frame = source.read()
+        assert ret and frame.shape == (4, 4, 3)
+    finally:
+        source.release()
+
+
+def test_camera_waits_out_a_long_failure_burst(monkeypatch):
+    # Real RETRY_DELAY: 7 failed grabs back off for about 1.3 s in total
+    monkeypatch.setattr(sources.cv2, 'VideoCapture', lambda device: FakeCapture(device, failures=7))
+    source = CameraSource(threaded=True, max_failures=10)
+    start = time.monotonic()
+    try:
+        ret, frame = source.read()
+        assert ret and frame.shape == (4, 4, 3)
+        assert time.monotonic() - start > 1.0
+    finally:
+        source.release()
+
+
+def test_camera_ends_after_failure_budget(fake_capture):
+    fake_capture(failures=10**6)
+    source = CameraSource(threaded=True, max_failures=3)
+    try:
+        ret, frame = source.read()
+        assert not ret and frame is None
+        assert source.cap.reads == 4
+    finally:
+        source.release()
+    assert source.cap.released
+
+
+def test_camera_release_waits_for_read_in_progress(fake_capture):
+    block = threading.Event()
+    fake_capture(block=block)
+    source = CameraSource(threaded=True)
+    thread = source._thread
+    source.release()
+    # The capture thread is stuck inside read(): the capture must not be closed under it
+    assert thread.is_alive() and not source.cap.released
+    block.set()
+    thread.join(timeout=2.0)
+    assert source.cap.released